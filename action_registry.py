@@ -0,0 +1,111 @@
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+ActionFunc = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class EmptyParams(BaseModel):
+    pass
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ActionHandler:
+    def __init__(self, name: str, func: ActionFunc, params_model: Type[BaseModel], requires_session: bool):
+        self.name = name
+        self.func = func
+        self.params_model = params_model
+        self.requires_session = requires_session
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def parse(self, values: Dict[str, Any]) -> BaseModel:
+        try:
+            return self.params_model.model_validate({k: v for k, v in values.items() if v is not None})
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            raise HTTPException(status_code=400, detail=f"❌ Invalid parameters for {self.name}: {problems}")
+
+    async def __call__(self, params: BaseModel, session_id: Optional[str], session: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.rate_limiter and not self.rate_limiter.try_acquire():
+            self.rate_limited += 1
+            raise HTTPException(status_code=429, detail=f"❌ Rate limit exceeded for {self.name}")
+
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            return await self.func(params, session_id, session)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "rate_limit": self.rate_limiter.rate if self.rate_limiter else None
+        }
+
+
+ACTION_HANDLERS: Dict[str, ActionHandler] = {}
+
+
+def register_action(name: str, params: Type[BaseModel] = EmptyParams, requires_session: bool = True):
+    def decorator(func: ActionFunc) -> ActionFunc:
+        ACTION_HANDLERS[name] = ActionHandler(name, func, params, requires_session)
+        return func
+    return decorator
+
+
+def get_action_handler(name: str) -> Optional[ActionHandler]:
+    return ACTION_HANDLERS.get(name)
+
+
+def set_rate_limit(name: str, rate: float, burst: Optional[int] = None):
+    handler = ACTION_HANDLERS.get(name)
+    if handler:
+        handler.rate_limiter = RateLimiter(rate, burst) if rate > 0 else None
+
+
+def configure_rate_limits(spec: Optional[str] = None):
+    spec = spec if spec is not None else os.getenv("ACTION_RATE_LIMITS", "")
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        set_rate_limit(name.strip(), float(rate))
+
+
+def action_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: handler.stats() for name, handler in ACTION_HANDLERS.items()}
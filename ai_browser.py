@@ -1,9 +1,23 @@
-from fastapi import FastAPI
-import requests
+import httpx
 import json
-from typing import Optional, Dict, Any
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, AsyncIterator, Deque, Tuple
 import asyncio
 
+from tracing import record_span, span
+
+AI_BASE_URL = os.getenv("AI_BASE_URL", "https://gemini.browserbase.com")
+AI_SESSION_TIMEOUT = float(os.getenv("AI_SESSION_TIMEOUT", 30))
+AI_STREAM_TIMEOUT = float(os.getenv("AI_STREAM_TIMEOUT", 300))
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", 20))
+AI_POOL_SIZE = int(os.getenv("AI_POOL_SIZE", 2))
+AI_MAX_SESSIONS = int(os.getenv("AI_MAX_SESSIONS", 100))
+AI_SESSION_TTL = float(os.getenv("AI_SESSION_TTL", 1800))
+AI_POOL_INTERVAL = float(os.getenv("AI_POOL_INTERVAL", 30))
+AI_HEALTH_PATH = os.getenv("AI_HEALTH_PATH", "/")
+
 BASE_HEADERS = {
     'authority': 'gemini.browserbase.com',
     'accept-language': 'en-US,en;q=0.9',
@@ -17,21 +31,37 @@ BASE_HEADERS = {
     'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
 }
 
-ai_sessions: Dict[str, str] = {}
+ai_client: Optional[httpx.AsyncClient] = None
 
-async def create_ai_session() -> Optional[str]:
-    session_url = 'https://gemini.browserbase.com/api/session'
-    
-    session_headers = BASE_HEADERS.copy()
-    session_headers['accept'] = '*/*'
-    session_headers['content-type'] = 'application/json'
+def get_ai_client() -> httpx.AsyncClient:
+    global ai_client
+    if ai_client is None or ai_client.is_closed:
+        ai_client = httpx.AsyncClient(
+            base_url=AI_BASE_URL,
+            headers=BASE_HEADERS,
+            timeout=httpx.Timeout(AI_SESSION_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_CONNECTIONS
+            )
+        )
+    return ai_client
+
+async def close_ai_client():
+    global ai_client
+    if ai_client is not None:
+        await ai_client.aclose()
+        ai_client = None
 
+async def create_ai_session(timeout: Optional[float] = None) -> Optional[str]:
     try:
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: requests.post(session_url, headers=session_headers, json={'timezone': 'EEST'})
-        )
+        with span("ai.create_session"):
+            response = await get_ai_client().post(
+                '/api/session',
+                headers={'accept': '*/*', 'content-type': 'application/json'},
+                json={'timezone': 'EEST'},
+                timeout=timeout or AI_SESSION_TIMEOUT
+            )
         response.raise_for_status()
         session_data = response.json()
         session_id = session_data.get('sessionId')
@@ -43,61 +73,231 @@ async def create_ai_session() -> Optional[str]:
         print(f"AI Session Error: {e}")
         return None
 
-async def execute_ai_command(session_id: str, prompt: str) -> Dict[str, Any]:
-    stream_headers = BASE_HEADERS.copy()
-    stream_headers['accept'] = 'text/event-stream'
+async def iter_ai_events(session_id: str, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
     params = {'sessionId': session_id, 'goal': prompt}
-    
-    result = {
+    stream_timeout = httpx.Timeout(AI_SESSION_TIMEOUT, read=timeout or AI_STREAM_TIMEOUT)
+    started = time.perf_counter()
+    first_event_ms = None
+    events = 0
+    error = None
+
+    try:
+        async with get_ai_client().stream(
+            'GET',
+            '/api/agent/stream',
+            params=params,
+            headers={'accept': 'text/event-stream'},
+            timeout=stream_timeout
+        ) as response:
+            response.raise_for_status()
+            record_span("ai.connect", started, status=response.status_code)
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                try:
+                    data = json.loads(line[5:].strip())
+                except json.JSONDecodeError:
+                    continue
+                events += 1
+                if first_event_ms is None:
+                    first_event_ms = round((time.perf_counter() - started) * 1000, 2)
+                yield data
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_span("ai.stream", started, error=error, events=events, first_event_ms=first_event_ms)
+
+def classify_ai_event(data: Dict[str, Any]) -> str:
+    if data.get('success') is True:
+        return 'final'
+    if 'token' in data:
+        return 'token'
+    message = data.get('message') or ''
+    if data.get('category') == 'agent' and data.get('level') == 1 and '💭' in message:
+        return 'thought'
+    return 'event'
+
+def new_ai_result() -> Dict[str, Any]:
+    return {
         "success": False,
         "thoughts": [],
         "final_message": "",
         "summary": ""
     }
 
-    try:
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: requests.get(
-                'https://gemini.browserbase.com/api/agent/stream',
-                params=params,
-                headers=stream_headers,
-                stream=True,
-                timeout=300
-            )
-        )
-        response.raise_for_status()
+def apply_ai_event(result: Dict[str, Any], data: Dict[str, Any]):
+    if data.get('category') == 'agent':
+        level = data.get('level')
+        message = data.get('message')
+        if level == 1 and message and '💭' in message:
+            clean_message = message.replace('💭', '').strip()
+            result["thoughts"].append(clean_message)
+    
+    if data.get('success') is True:
+        result["success"] = True
+        result["final_message"] = data.get('finalMessage', '')
+    
+    if 'token' in data:
+        result["summary"] += data['token']
 
-        summary_text = ""
-        for line in response.iter_lines():
-            if line:
-                decoded_line = line.decode('utf-8')
-                if decoded_line.startswith('data:'):
-                    json_data_str = decoded_line[5:].strip()
-                    try:
-                        data = json.loads(json_data_str)
-                        
-                        if data.get('category') == 'agent':
-                            level = data.get('level')
-                            message = data.get('message')
-                            if level == 1 and message and '💭' in message:
-                                clean_message = message.replace('💭', '').strip()
-                                result["thoughts"].append(clean_message)
-                        
-                        if data.get('success') is True:
-                            result["success"] = True
-                            result["final_message"] = data.get('finalMessage', '')
-                        
-                        if 'token' in data:
-                            summary_text += data['token']
-                            
-                    except json.JSONDecodeError:
-                        continue
-        
-        result["summary"] = summary_text
+async def execute_ai_command(session_id: str, prompt: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    result = new_ai_result()
+
+    async def consume():
+        async for data in iter_ai_events(session_id, prompt, timeout):
+            apply_ai_event(result, data)
+
+    try:
+        await asyncio.wait_for(consume(), timeout=timeout or AI_STREAM_TIMEOUT)
+        return result
+    except asyncio.TimeoutError:
+        result["error"] = "AI command timed out"
         return result
-        
     except Exception as e:
         result["error"] = str(e)
         return result
+
+class AiSessionPool:
+    def __init__(
+        self,
+        size: int = AI_POOL_SIZE,
+        max_sessions: int = AI_MAX_SESSIONS,
+        ttl: float = AI_SESSION_TTL,
+        interval: float = AI_POOL_INTERVAL
+    ):
+        self.size = max(0, size)
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        self.interval = interval
+        self.idle: Deque[Tuple[str, float]] = deque()
+        self.bound: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.healthy = True
+        self.last_probe_ms: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self._refill_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.bound)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.bound
+
+    def is_fresh(self, created_at: float) -> bool:
+        return time.monotonic() - created_at < self.ttl
+
+    async def acquire(self, session_id: str) -> Optional[str]:
+        entry = self.bound.get(session_id)
+        if entry and self.is_fresh(entry[1]):
+            self.bound.move_to_end(session_id)
+            return entry[0]
+        if entry:
+            self.bound.pop(session_id)
+            self.expired += 1
+
+        ai_session_id = None
+        created_at = time.monotonic()
+        while self.idle:
+            candidate, candidate_created_at = self.idle.popleft()
+            if self.is_fresh(candidate_created_at):
+                ai_session_id, created_at = candidate, candidate_created_at
+                break
+            self.expired += 1
+
+        if ai_session_id:
+            self.hits += 1
+        else:
+            self.misses += 1
+            ai_session_id = await create_ai_session()
+            created_at = time.monotonic()
+        self.schedule_refill()
+        if not ai_session_id:
+            return None
+
+        self.bound[session_id] = (ai_session_id, created_at)
+        while len(self.bound) > self.max_sessions:
+            self.bound.popitem(last=False)
+            self.evicted += 1
+        return ai_session_id
+
+    def release(self, session_id: str):
+        self.bound.pop(session_id, None)
+
+    def schedule_refill(self):
+        if self.size == 0 or not self.healthy:
+            return
+        if self._refill_task and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        while self.healthy and len(self.idle) < self.size:
+            ai_session_id = await create_ai_session()
+            if not ai_session_id:
+                return
+            self.idle.append((ai_session_id, time.monotonic()))
+
+    def expire(self):
+        for session_id, (_, created_at) in list(self.bound.items()):
+            if not self.is_fresh(created_at):
+                self.bound.pop(session_id)
+                self.expired += 1
+        fresh = deque(entry for entry in self.idle if self.is_fresh(entry[1]))
+        self.expired += len(self.idle) - len(fresh)
+        self.idle = fresh
+
+    async def probe(self) -> bool:
+        started = time.perf_counter()
+        try:
+            response = await get_ai_client().get(AI_HEALTH_PATH, timeout=AI_SESSION_TIMEOUT)
+            self.healthy = response.status_code < 500
+        except Exception as e:
+            print(f"AI Health Probe Error: {e}")
+            self.healthy = False
+        self.last_probe_ms = round((time.perf_counter() - started) * 1000, 2)
+        if not self.healthy:
+            self.idle.clear()
+        return self.healthy
+
+    async def _maintain(self):
+        while True:
+            await self.probe()
+            self.expire()
+            self.schedule_refill()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintain())
+
+    async def stop(self):
+        for task in (self._maintenance_task, self._refill_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._maintenance_task = None
+        self._refill_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "last_probe_ms": self.last_probe_ms,
+            "idle": len(self.idle),
+            "bound": len(self.bound),
+            "size": self.size,
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+ai_session_pool = AiSessionPool()
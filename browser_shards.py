@@ -0,0 +1,180 @@
+import asyncio
+import time
+import uuid
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
+from context_pool import ContextPool
+from proc_stats import find_pid_with_arg, process_tree_rss
+
+BrowserContextFactory = Callable[..., Awaitable[Tuple[BrowserContext, Page]]]
+DisconnectCallback = Callable[["BrowserShard"], None]
+
+RSS_SAMPLE_INTERVAL = 5.0
+
+
+class BrowserShard:
+    def __init__(self, index: int, browser: Browser, marker: str, pool: ContextPool):
+        self.index = index
+        self.browser = browser
+        self.marker = marker
+        self.pool = pool
+        self.session_ids = set()
+        self.pid: Optional[int] = None
+        self.rss_bytes = 0
+        self._rss_sampled_at = 0.0
+        self.recovering = False
+        self.restarts = 0
+
+    def is_running(self) -> bool:
+        return self.browser.is_connected() and not self.recovering
+
+    async def sample_rss(self, force: bool = False) -> int:
+        now = time.monotonic()
+        if not force and now - self._rss_sampled_at < RSS_SAMPLE_INTERVAL:
+            return self.rss_bytes
+        self._rss_sampled_at = now
+        if self.pid is None:
+            self.pid = await asyncio.to_thread(find_pid_with_arg, self.marker)
+        self.rss_bytes = await asyncio.to_thread(process_tree_rss, self.pid) if self.pid else 0
+        return self.rss_bytes
+
+    def load(self) -> Tuple[int, int]:
+        return len(self.session_ids), self.rss_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "running": self.is_running(),
+            "recovering": self.recovering,
+            "restarts": self.restarts,
+            "pid": self.pid,
+            "sessions": len(self.session_ids),
+            "rss_mb": round(self.rss_bytes / (1024 * 1024), 1),
+            "context_pool": self.pool.stats()
+        }
+
+
+class ShardManager:
+    def __init__(
+        self,
+        playwright: Playwright,
+        count: int,
+        launch_args: List[str],
+        context_factory: BrowserContextFactory,
+        pool_size: int = 2,
+        pool_min_idle: int = 1,
+        pool_max_idle: int = 4,
+        on_disconnect: Optional[DisconnectCallback] = None
+    ):
+        self.playwright = playwright
+        self.count = max(1, count)
+        self.launch_args = launch_args
+        self.context_factory = context_factory
+        self.pool_settings = {"size": pool_size, "min_idle": pool_min_idle, "max_idle": pool_max_idle}
+        self.shards: List[BrowserShard] = []
+        self.owners: Dict[str, BrowserShard] = {}
+        self.on_disconnect = on_disconnect
+        self.closing = False
+
+    async def start(self):
+        for index in range(self.count):
+            self.shards.append(await self.launch_shard(index))
+
+    async def _launch_browser(self) -> Tuple[Browser, str, ContextPool]:
+        marker = f"--hammer-shard={uuid.uuid4().hex}"
+        browser = await self.playwright.chromium.launch(
+            headless=True,
+            args=self.launch_args + [marker]
+        )
+        pool = ContextPool(partial(self.context_factory, browser), **self.pool_settings)
+        return browser, marker, pool
+
+    def _watch(self, shard: BrowserShard):
+        browser = shard.browser
+
+        def disconnected(_browser: Browser):
+            if self.closing or shard.browser is not browser:
+                return
+            shard.recovering = True
+            if self.on_disconnect:
+                self.on_disconnect(shard)
+
+        browser.on("disconnected", disconnected)
+
+    async def launch_shard(self, index: int) -> BrowserShard:
+        browser, marker, pool = await self._launch_browser()
+        shard = BrowserShard(index, browser, marker, pool)
+        await shard.sample_rss(force=True)
+        await pool.start()
+        self._watch(shard)
+        return shard
+
+    async def relaunch_shard(self, shard: BrowserShard):
+        try:
+            await shard.pool.close()
+        except Exception:
+            pass
+        try:
+            await shard.browser.close()
+        except Exception:
+            pass
+        browser, marker, pool = await self._launch_browser()
+        shard.browser = browser
+        shard.marker = marker
+        shard.pool = pool
+        shard.pid = None
+        shard.restarts += 1
+        await shard.sample_rss(force=True)
+        await pool.start()
+        self._watch(shard)
+
+    def place(self) -> BrowserShard:
+        running = [shard for shard in self.shards if shard.is_running()] or self.shards
+        return min(running, key=lambda shard: shard.load())
+
+    async def acquire(self, session_id: str, storage_state: Optional[Dict[str, Any]] = None) -> Tuple[BrowserShard, BrowserContext, Page]:
+        await self.sample_rss()
+        shard = self.place()
+        shard.session_ids.add(session_id)
+        self.owners[session_id] = shard
+        try:
+            if storage_state is not None:
+                context, page = await self.context_factory(shard.browser, storage_state)
+            else:
+                context, page = await shard.pool.acquire()
+        except BaseException:
+            self.release(session_id)
+            raise
+        return shard, context, page
+
+    def owner(self, session_id: str) -> Optional[BrowserShard]:
+        return self.owners.get(session_id)
+
+    def release(self, session_id: str):
+        shard = self.owners.pop(session_id, None)
+        if shard:
+            shard.session_ids.discard(session_id)
+
+    async def sample_rss(self, force: bool = False) -> List[int]:
+        return await asyncio.gather(*(shard.sample_rss(force) for shard in self.shards))
+
+    async def total_rss(self) -> int:
+        return sum(await self.sample_rss(force=True))
+
+    def is_running(self) -> bool:
+        return bool(self.shards) and all(shard.is_running() for shard in self.shards)
+
+    async def close(self):
+        self.closing = True
+        for shard in self.shards:
+            await shard.pool.close()
+            try:
+                await shard.browser.close()
+            except:
+                pass
+        self.shards = []
+        self.owners.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [shard.stats() for shard in self.shards]
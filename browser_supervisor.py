@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from browser_shards import BrowserShard, ShardManager
+
+RestoreCallback = Callable[[str, BrowserShard], Awaitable[bool]]
+
+
+class BrowserSupervisor:
+    def __init__(
+        self,
+        shard_manager: ShardManager,
+        sessions: Dict[str, Dict[str, Any]],
+        restore: RestoreCallback,
+        interval: float = 5,
+        snapshot_interval: float = 30,
+        backoff_initial: float = 1,
+        backoff_max: float = 30,
+        restore_concurrency: int = 4
+    ):
+        self.shard_manager = shard_manager
+        self.sessions = sessions
+        self.restore = restore
+        self.interval = interval
+        self.snapshot_interval = snapshot_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.restore_semaphore = asyncio.Semaphore(restore_concurrency)
+        self.recovering: Set[int] = set()
+        self.recoveries: Set[asyncio.Task] = set()
+        self.crashes = 0
+        self.relaunches = 0
+        self.failed_launches = 0
+        self.restored_sessions = 0
+        self.failed_restores = 0
+        self.last_recovery_ms: Optional[float] = None
+        self.snapshots = 0
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    def on_disconnect(self, shard: BrowserShard):
+        if shard.index in self.recovering:
+            return
+        self.crashes += 1
+        self.recovering.add(shard.index)
+        print(f"Browser Supervisor: shard {shard.index} disconnected, relaunching")
+        task = asyncio.ensure_future(self.recover(shard))
+        self.recoveries.add(task)
+        task.add_done_callback(self.recoveries.discard)
+
+    async def recover(self, shard: BrowserShard):
+        started = time.perf_counter()
+        delay = self.backoff_initial
+        try:
+            while True:
+                try:
+                    await self.shard_manager.relaunch_shard(shard)
+                    self.relaunches += 1
+                    break
+                except Exception as e:
+                    self.failed_launches += 1
+                    print(f"Browser Supervisor Error: shard {shard.index} relaunch failed: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.backoff_max)
+
+            session_ids = [session_id for session_id in list(shard.session_ids) if session_id in self.sessions]
+            results = await asyncio.gather(*(self._restore(session_id, shard) for session_id in session_ids))
+            self.restored_sessions += sum(1 for restored in results if restored)
+            self.failed_restores += sum(1 for restored in results if not restored)
+            self.last_recovery_ms = round((time.perf_counter() - started) * 1000, 2)
+        finally:
+            shard.recovering = False
+            self.recovering.discard(shard.index)
+
+    async def _restore(self, session_id: str, shard: BrowserShard) -> bool:
+        async with self.restore_semaphore:
+            try:
+                return await self.restore(session_id, shard)
+            except Exception as e:
+                print(f"Browser Supervisor Error: restoring {session_id} failed: {e}")
+                return False
+
+    async def check(self):
+        for shard in self.shard_manager.shards:
+            if shard.index not in self.recovering and not shard.browser.is_connected():
+                shard.recovering = True
+                self.on_disconnect(shard)
+
+    async def snapshot(self):
+        for session_id, session in list(self.sessions.items()):
+            shard = self.shard_manager.owner(session_id)
+            if shard is None or not shard.is_running():
+                continue
+            try:
+                session['last_url'] = session['page'].url
+                session['storage_state'] = await asyncio.wait_for(session['context'].storage_state(), 10)
+                self.snapshots += 1
+            except Exception:
+                continue
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Browser Supervisor Error: {e}")
+
+    async def _run_snapshots(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await self.snapshot()
+            except Exception as e:
+                print(f"Browser Supervisor Error: {e}")
+
+    async def start(self):
+        self.shard_manager.on_disconnect = self.on_disconnect
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._snapshot_task is None and self.snapshot_interval > 0:
+            self._snapshot_task = asyncio.create_task(self._run_snapshots())
+
+    async def stop(self):
+        self.shard_manager.on_disconnect = None
+        for task in [self._task, self._snapshot_task, *self.recoveries]:
+            if task:
+                task.cancel()
+        await asyncio.gather(*(task for task in [self._task, self._snapshot_task, *self.recoveries] if task), return_exceptions=True)
+        self._task = None
+        self._snapshot_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "crashes": self.crashes,
+            "relaunches": self.relaunches,
+            "failed_launches": self.failed_launches,
+            "recovering_shards": sorted(self.recovering),
+            "restored_sessions": self.restored_sessions,
+            "failed_restores": self.failed_restores,
+            "last_recovery_ms": self.last_recovery_ms,
+            "snapshots": self.snapshots
+        }
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class WaitStats:
+    def __init__(self):
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @asynccontextmanager
+    async def hold(self, primitive) -> AsyncIterator[None]:
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await primitive.acquire()
+        finally:
+            self.waiting -= 1
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.acquired += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            primitive.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquired, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2)
+        }
+
+
+class ConcurrencyLimiter:
+    def __init__(self, global_limit: int = 32, action_budgets: Optional[Dict[str, int]] = None):
+        self.global_limit = global_limit
+        self.global_semaphore = asyncio.Semaphore(global_limit)
+        self.global_stats = WaitStats()
+        self.action_budgets = dict(action_budgets or {})
+        self.action_semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.action_budgets.items()}
+        self.action_stats: Dict[str, WaitStats] = {name: WaitStats() for name in self.action_budgets}
+        self.session_locks: Dict[str, asyncio.Lock] = {}
+        self.session_stats: Dict[str, WaitStats] = {}
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str], action: str) -> AsyncIterator[None]:
+        async with self._session_slot(session_id):
+            async with self._action_slot(action):
+                async with self.global_stats.hold(self.global_semaphore):
+                    yield
+
+    @asynccontextmanager
+    async def _session_slot(self, session_id: Optional[str]) -> AsyncIterator[None]:
+        if session_id is None:
+            yield
+            return
+        lock = self.session_locks.setdefault(session_id, asyncio.Lock())
+        stats = self.session_stats.setdefault(session_id, WaitStats())
+        async with stats.hold(lock):
+            yield
+
+    @asynccontextmanager
+    async def _action_slot(self, action: str) -> AsyncIterator[None]:
+        semaphore = self.action_semaphores.get(action)
+        if semaphore is None:
+            yield
+            return
+        async with self.action_stats[action].hold(semaphore):
+            yield
+
+    def busy(self, session_id: str) -> bool:
+        stats = self.session_stats.get(session_id)
+        return stats is not None and bool(stats.waiting or stats.in_flight)
+
+    def discard(self, session_id: str):
+        self.session_locks.pop(session_id, None)
+        self.session_stats.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "global_limit": self.global_limit,
+            "global": self.global_stats.stats(),
+            "actions": {
+                name: {"limit": self.action_budgets[name], **stats.stats()}
+                for name, stats in self.action_stats.items()
+            },
+            "session_queue_depth": sum(stats.waiting for stats in self.session_stats.values()),
+            "busy_sessions": sum(1 for stats in self.session_stats.values() if stats.in_flight)
+        }
+
+
+def parse_action_budgets(spec: Optional[str] = None) -> Dict[str, int]:
+    spec = spec if spec is not None else os.getenv("ACTION_CONCURRENCY", "screenshot=4,ai_command=8")
+    budgets = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, limit = item.split("=", 1)
+        budgets[name.strip()] = max(1, int(limit))
+    return budgets
@@ -0,0 +1,182 @@
+import zlib
+from typing import AsyncIterator, Dict, Optional, Tuple
+from playwright.async_api import Page
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8"
+}
+
+RENDER_SCRIPT = """
+(mode) => {
+    const pickRoot = () => document.querySelector('article, main, [role=main]') || document.body || document.documentElement;
+    const toMarkdown = (root) => {
+        const skip = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'svg', 'IFRAME', 'NAV', 'FOOTER', 'ASIDE', 'FORM']);
+        const inline = (node) => {
+            if (node.nodeType === Node.TEXT_NODE) {
+                return node.textContent.replace(/\\s+/g, ' ');
+            }
+            if (node.nodeType !== Node.ELEMENT_NODE || skip.has(node.tagName)) {
+                return '';
+            }
+            const inner = Array.from(node.childNodes).map(inline).join('');
+            switch (node.tagName) {
+                case 'A': return node.href ? `[${inner.trim()}](${node.href})` : inner;
+                case 'STRONG': case 'B': return inner.trim() ? `**${inner.trim()}**` : '';
+                case 'EM': case 'I': return inner.trim() ? `_${inner.trim()}_` : '';
+                case 'CODE': return `\\`${inner}\\``;
+                case 'IMG': return node.alt || node.src ? `![${node.alt || ''}](${node.src})` : '';
+                case 'BR': return '\\n';
+                default: return inner;
+            }
+        };
+        const blocks = [];
+        const walk = (node, depth) => {
+            if (node.nodeType !== Node.ELEMENT_NODE || skip.has(node.tagName)) {
+                return;
+            }
+            const tag = node.tagName;
+            if (/^H[1-6]$/.test(tag)) {
+                blocks.push('#'.repeat(Number(tag[1])) + ' ' + inline(node).trim());
+            } else if (tag === 'P' || tag === 'BLOCKQUOTE') {
+                const text = inline(node).trim();
+                if (text) {
+                    blocks.push(tag === 'P' ? text : '> ' + text);
+                }
+            } else if (tag === 'PRE') {
+                blocks.push('```\\n' + node.innerText + '\\n```');
+            } else if (tag === 'UL' || tag === 'OL') {
+                const items = Array.from(node.children).filter(child => child.tagName === 'LI');
+                blocks.push(items.map((item, index) => '  '.repeat(depth) + (tag === 'OL' ? `${index + 1}. ` : '- ') + inline(item).trim()).join('\\n'));
+            } else if (tag === 'TABLE') {
+                const rows = Array.from(node.rows).map(row => '| ' + Array.from(row.cells).map(cell => inline(cell).trim()).join(' | ') + ' |');
+                if (rows.length) {
+                    const columns = node.rows[0].cells.length;
+                    rows.splice(1, 0, '|' + ' --- |'.repeat(columns));
+                    blocks.push(rows.join('\\n'));
+                }
+            } else if (tag === 'HR') {
+                blocks.push('---');
+            } else {
+                Array.from(node.children).forEach(child => walk(child, depth));
+            }
+        };
+        walk(root, 0);
+        return blocks.join('\\n\\n');
+    };
+    let content;
+    if (mode === 'text') {
+        content = (pickRoot().innerText || '').replace(/\\n{3,}/g, '\\n\\n').trim();
+    } else if (mode === 'markdown') {
+        const title = document.title ? `# ${document.title}\\n\\n` : '';
+        content = title + toMarkdown(pickRoot());
+    } else {
+        const doctype = document.doctype ? new XMLSerializer().serializeToString(document.doctype) : '';
+        content = doctype + document.documentElement.outerHTML;
+    }
+    const key = '__hammer_content_' + Math.random().toString(36).slice(2);
+    window[key] = content;
+    return [key, content.length];
+}
+"""
+
+SLICE_SCRIPT = """
+([key, start, size]) => {
+    const content = window[key];
+    let end = Math.min(start + size, content.length);
+    const code = content.charCodeAt(end - 1);
+    if (end < content.length && code >= 0xD800 && code <= 0xDBFF) {
+        end -= 1;
+    }
+    return [content.slice(start, end), end];
+}
+"""
+RELEASE_SCRIPT = "(key) => { delete window[key]; }"
+
+
+async def render_content(page: Page, mode: str) -> str:
+    key, length = await page.evaluate(RENDER_SCRIPT, mode)
+    try:
+        content, _ = await page.evaluate(SLICE_SCRIPT, [key, 0, length])
+        return content
+    finally:
+        await page.evaluate(RELEASE_SCRIPT, key)
+
+
+async def snapshot_content(page: Page, mode: str = "html") -> Tuple[str, int]:
+    key, length = await page.evaluate(RENDER_SCRIPT, mode)
+    return key, length
+
+
+async def iter_snapshot(page: Page, key: str, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[str]:
+    try:
+        start = 0
+        while start < length:
+            chunk, start = await page.evaluate(SLICE_SCRIPT, [key, start, chunk_size])
+            yield chunk
+    finally:
+        try:
+            await page.evaluate(RELEASE_SCRIPT, key)
+        except Exception:
+            pass
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class StreamEncoder:
+    def __init__(self, encoding: Optional[str]):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=5)
+        elif encoding == "gzip":
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        else:
+            self.compressor = None
+
+    def encode(self, chunk: str) -> bytes:
+        data = chunk.encode("utf-8")
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        if self.encoding == "gzip":
+            return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        if self.encoding == "gzip":
+            return self.compressor.flush()
+        return b""
+
+
+async def encode_stream(chunks: AsyncIterator[str], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    encoder = StreamEncoder(encoding)
+    async for chunk in chunks:
+        data = encoder.encode(chunk)
+        if data:
+            yield data
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+def response_headers(encoding: Optional[str]) -> Dict[str, str]:
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-store"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
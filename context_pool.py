@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from playwright.async_api import BrowserContext, Page
+
+ContextFactory = Callable[[], Awaitable[Tuple[BrowserContext, Page]]]
+
+
+class ContextPool:
+    def __init__(self, factory: ContextFactory, size: int = 2, min_idle: int = 1, max_idle: int = 4):
+        self.factory = factory
+        self.max_idle = max(0, max_idle)
+        self.size = max(0, min(size, self.max_idle))
+        self.min_idle = max(0, min(min_idle, self.size))
+        self.idle: List[Tuple[BrowserContext, Page]] = []
+        self.hits = 0
+        self.misses = 0
+        self.refill_errors = 0
+        self._creating = 0
+        self._refill_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        self._closed = False
+        self.schedule_refill()
+
+    async def acquire(self) -> Tuple[BrowserContext, Page]:
+        while self.idle:
+            context, page = self.idle.pop()
+            if page.is_closed():
+                await self._discard(context)
+                continue
+            self.hits += 1
+            if len(self.idle) < self.min_idle:
+                self.schedule_refill()
+            return context, page
+
+        self.misses += 1
+        self.schedule_refill()
+        return await self.factory()
+
+    def schedule_refill(self):
+        if self._closed or self.size == 0:
+            return
+        if self._refill_task and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        while not self._closed and len(self.idle) + self._creating < self.size:
+            self._creating += 1
+            try:
+                context, page = await self.factory()
+            except Exception as e:
+                self.refill_errors += 1
+                print(f"Context Pool Error: {e}")
+                return
+            finally:
+                self._creating -= 1
+
+            if self._closed or len(self.idle) >= self.max_idle:
+                await self._discard(context)
+                return
+            self.idle.append((context, page))
+
+    async def _discard(self, context: BrowserContext):
+        try:
+            await context.close()
+        except:
+            pass
+
+    async def close(self):
+        self._closed = True
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        while self.idle:
+            context, _ = self.idle.pop()
+            await self._discard(context)
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "size": self.size,
+            "min_idle": self.min_idle,
+            "max_idle": self.max_idle,
+            "idle": len(self.idle),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 3) if requests else 0.0,
+            "refill_errors": self.refill_errors
+        }
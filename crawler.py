@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+from pydantic import Field
+from playwright.async_api import Page
+
+from content_stream import render_content
+from extraction import EXTRACT_SCRIPT, ExtractField
+from resource_policy import ResourcePolicy
+from screenshots import capture_screenshot, encode_screenshot
+from waits import LOAD_STATES, WaitMode, WaitParams, run_with_wait
+
+CRAWL_MAX_URLS = int(os.getenv("CRAWL_MAX_URLS", 1000))
+CRAWL_MAX_CONCURRENCY = int(os.getenv("CRAWL_MAX_CONCURRENCY", 16))
+CRAWL_NAVIGATE_TIMEOUT = int(os.getenv("CRAWL_NAVIGATE_TIMEOUT", 30000))
+
+
+class CrawlRequest(ResourcePolicy, WaitParams):
+    urls: List[str] = Field(min_length=1)
+    concurrency: int = Field(default=4, ge=1)
+    retries: int = Field(default=1, ge=0, le=5)
+    retry_backoff_ms: int = Field(default=500, ge=0)
+    wait_until: Optional[WaitMode] = "load"
+    include_content: bool = True
+    mode: Literal["html", "text", "markdown"] = "text"
+    screenshot: bool = False
+    screenshot_format: Literal["png", "jpeg", "webp"] = "jpeg"
+    quality: Optional[int] = Field(default=70, ge=1, le=100)
+    max_width: Optional[int] = Field(default=None, gt=0)
+    extract_schema: Optional[Dict[str, ExtractField]] = None
+
+
+class CrawlTotals:
+    def __init__(self):
+        self.active_jobs = 0
+        self.jobs = 0
+        self.urls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_jobs": self.active_jobs,
+            "jobs": self.jobs,
+            "urls": self.urls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries
+        }
+
+
+crawl_totals = CrawlTotals()
+
+OpenPage = Callable[[], Awaitable[Tuple[Any, Page]]]
+ClosePage = Callable[[Any], Awaitable[None]]
+Slot = Callable[[], AsyncContextManager[None]]
+
+
+class Crawler:
+    def __init__(self, request: CrawlRequest, open_page: OpenPage, close_page: ClosePage, slot: Slot):
+        self.request = request
+        self.open_page = open_page
+        self.close_page = close_page
+        self.slot = slot
+        self.concurrency = max(1, min(request.concurrency, CRAWL_MAX_CONCURRENCY, len(request.urls)))
+        self.queue: "asyncio.Queue[Tuple[int, str, int]]" = asyncio.Queue()
+        self.results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=self.concurrency)
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.total_url_ms = 0.0
+        self.max_url_ms = 0.0
+
+    async def visit(self, page: Page, url: str) -> Dict[str, Any]:
+        request = self.request
+        response = None
+
+        async def goto():
+            nonlocal response
+            goto_wait = request.wait_until if request.wait_until in LOAD_STATES else "commit"
+            response = await page.goto(url, wait_until=goto_wait, timeout=request.timeout or CRAWL_NAVIGATE_TIMEOUT)
+
+        wait_ms = await run_with_wait(page, request, goto)
+        result: Dict[str, Any] = {
+            "final_url": page.url,
+            "status": response.status if response else None,
+            "title": await page.title(),
+            "wait_ms": wait_ms
+        }
+        if request.include_content:
+            result["content"] = await page.content() if request.mode == "html" else await render_content(page, request.mode)
+        if request.extract_schema:
+            schema = {name: field.model_dump(exclude_none=True) for name, field in request.extract_schema.items()}
+            result["data"] = await page.evaluate(EXTRACT_SCRIPT, schema)
+        if request.screenshot:
+            image = await capture_screenshot(page, image_format=request.screenshot_format, quality=request.quality)
+            encoded = await encode_screenshot(
+                image,
+                image_format=request.screenshot_format,
+                quality=request.quality,
+                max_width=request.max_width
+            )
+            result["screenshot"] = encoded["images"][0]
+        return result
+
+    async def finish(self, index: int, url: str, attempt: int, started: float, result: Dict[str, Any]):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.total_url_ms += elapsed_ms
+        self.max_url_ms = max(self.max_url_ms, elapsed_ms)
+        if result["success"]:
+            self.succeeded += 1
+            crawl_totals.succeeded += 1
+        else:
+            self.failed += 1
+            crawl_totals.failed += 1
+        await self.results.put({
+            "type": "result",
+            "index": index,
+            "url": url,
+            "attempts": attempt + 1,
+            "elapsed_ms": round(elapsed_ms, 2),
+            **result
+        })
+
+    async def worker(self):
+        handle = None
+        page = None
+        try:
+            while True:
+                index, url, attempt = await self.queue.get()
+                started = time.perf_counter()
+                try:
+                    if page is None or page.is_closed():
+                        if handle is not None:
+                            await self.close_page(handle)
+                            handle = None
+                        handle, page = await self.open_page()
+                    async with self.slot():
+                        result = await self.visit(page, url)
+                    await self.finish(index, url, attempt, started, {"success": True, **result})
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if attempt < self.request.retries:
+                        self.retries += 1
+                        crawl_totals.retries += 1
+                        delay = self.request.retry_backoff_ms * (2 ** attempt) / 1000
+                        asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, (index, url, attempt + 1))
+                    else:
+                        await self.finish(index, url, attempt, started, {"success": False, "error": str(e)})
+        finally:
+            if handle is not None:
+                try:
+                    await self.close_page(handle)
+                except Exception as e:
+                    print(f"Crawl Close Error: {e}")
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        for index, url in enumerate(self.request.urls):
+            self.queue.put_nowait((index, url, 0))
+        crawl_totals.active_jobs += 1
+        crawl_totals.jobs += 1
+        crawl_totals.urls += len(self.request.urls)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.concurrency)]
+        try:
+            for _ in self.request.urls:
+                yield await self.results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            crawl_totals.active_jobs -= 1
+
+        elapsed = time.perf_counter() - started
+        completed = self.succeeded + self.failed
+        yield {
+            "type": "summary",
+            "total": len(self.request.urls),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "concurrency": self.concurrency,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "urls_per_second": round(completed / elapsed, 2) if elapsed else 0.0,
+            "avg_url_ms": round(self.total_url_ms / completed, 2) if completed else 0.0,
+            "max_url_ms": round(self.max_url_ms, 2)
+        }
+
+
+async def iter_ndjson(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
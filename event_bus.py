@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+
+class Subscriber:
+    def __init__(self, subscriber_id: int, max_queue: int, session_ids: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None):
+        self.id = subscriber_id
+        self.max_queue = max_queue
+        self.queue: Deque[Dict[str, Any]] = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.session_ids: Set[str] = set()
+        self.types: Set[str] = set()
+        self.set_filters(session_ids, types)
+        self.delivered = 0
+        self.dropped = 0
+        self.pending_dropped = 0
+
+    def set_filters(self, session_ids: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None):
+        self.session_ids = {item for item in (session_ids or []) if item}
+        self.types = {item for item in (types or []) if item}
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.types and event.get("type") not in self.types:
+            return False
+        if self.session_ids and event.get("session_id") not in self.session_ids:
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]):
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+            self.pending_dropped += 1
+        self.queue.append(event)
+        self.ready.set()
+
+    async def next(self) -> Optional[Dict[str, Any]]:
+        while not self.queue:
+            if self.closed:
+                return None
+            self.ready.clear()
+            await self.ready.wait()
+        if self.pending_dropped:
+            dropped, self.pending_dropped = self.pending_dropped, 0
+            return {"type": "events_dropped", "count": dropped}
+        self.delivered += 1
+        return self.queue.popleft()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "queued": len(self.queue),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "session_ids": sorted(self.session_ids),
+            "types": sorted(self.types)
+        }
+
+
+class EventBus:
+    def __init__(self, subscriber_queue: int = 256, max_pending: int = 10000):
+        self.subscriber_queue = subscriber_queue
+        self.pending: Deque[Dict[str, Any]] = deque(maxlen=max_pending)
+        self.pending_ready = asyncio.Event()
+        self.subscribers: Dict[int, Subscriber] = {}
+        self.ids = itertools.count(1)
+        self.task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+        self.closed_dropped = 0
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.fan_out())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        for subscriber in list(self.subscribers.values()):
+            subscriber.close()
+
+    def publish(self, event: Dict[str, Any]):
+        self.published += 1
+        if not self.subscribers:
+            return
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(event)
+        self.pending_ready.set()
+
+    async def fan_out(self):
+        while True:
+            await self.pending_ready.wait()
+            self.pending_ready.clear()
+            while self.pending:
+                event = self.pending.popleft()
+                for subscriber in list(self.subscribers.values()):
+                    if subscriber.matches(event):
+                        subscriber.offer(event)
+
+    def subscribe(self, session_ids: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None) -> Subscriber:
+        subscriber = Subscriber(next(self.ids), self.subscriber_queue, session_ids, types)
+        self.subscribers[subscriber.id] = subscriber
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if self.subscribers.pop(subscriber.id, None):
+            self.closed_dropped += subscriber.dropped
+        subscriber.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "pending": len(self.pending),
+            "dropped_pending": self.dropped,
+            "dropped_subscriber": self.closed_dropped + sum(subscriber.dropped for subscriber in self.subscribers.values()),
+            "subscriber_queue": self.subscriber_queue
+        }
+
+
+def split_filter(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
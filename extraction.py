@@ -0,0 +1,81 @@
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+
+EXTRACT_SCRIPT = """
+(schema) => {
+    const find = (root, field) => {
+        if (field.selector_type === 'xpath') {
+            const snapshot = document.evaluate(field.selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) {
+                nodes.push(snapshot.snapshotItem(i));
+            }
+            return nodes;
+        }
+        return field.all ? Array.from(root.querySelectorAll(field.selector)) : [root.querySelector(field.selector)].filter(Boolean);
+    };
+    const read = (node, field) => {
+        if (field.fields) {
+            return extract(node, field.fields);
+        }
+        switch (field.type) {
+            case 'inner_html': return node.innerHTML ?? null;
+            case 'outer_html': return node.outerHTML ?? null;
+            case 'attribute': return node.getAttribute ? node.getAttribute(field.attribute) : null;
+            case 'value': return node.value ?? null;
+            default: return (node.innerText ?? node.textContent ?? '').trim();
+        }
+    };
+    const extract = (root, fields) => {
+        const result = {};
+        for (const [name, field] of Object.entries(fields)) {
+            let nodes = find(root, field);
+            if (field.all) {
+                if (field.limit) {
+                    nodes = nodes.slice(0, field.limit);
+                }
+                result[name] = nodes.map(node => read(node, field));
+            } else {
+                result[name] = nodes.length ? read(nodes[0], field) : null;
+            }
+        }
+        return result;
+    };
+    return extract(document, schema);
+}
+"""
+
+
+class ExtractField(BaseModel):
+    selector: str
+    selector_type: Literal["css", "xpath"] = "css"
+    type: Literal["text", "inner_html", "outer_html", "attribute", "value"] = "text"
+    attribute: Optional[str] = None
+    all: bool = False
+    limit: Optional[int] = Field(default=None, gt=0)
+    fields: Optional[Dict[str, "ExtractField"]] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def expand_shorthand(cls, data: Any) -> Any:
+        if isinstance(data, str):
+            data = {"selector": data}
+        if isinstance(data, dict):
+            selector = data.get("selector")
+            is_text = isinstance(selector, str)
+            if is_text and selector.startswith("xpath="):
+                data = {**data, "selector": selector[6:], "selector_type": "xpath"}
+            elif is_text and selector.startswith(("//", "./", "(")) and "selector_type" not in data:
+                data = {**data, "selector_type": "xpath"}
+            if data.get("attribute") and "type" not in data:
+                data = {**data, "type": "attribute"}
+        return data
+
+    @model_validator(mode="after")
+    def check_attribute(self):
+        if self.type == "attribute" and not self.attribute:
+            raise ValueError("attribute is required when type is 'attribute'")
+        return self
+
+
+ExtractField.model_rebuild()
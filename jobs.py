@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, action: str, payload: Any, priority: int):
+        self.id = str(uuid.uuid4())
+        self.action = action
+        self.payload = payload
+        self.priority = priority
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Any] = None
+        self.status_code: Optional[int] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Any = None, status_code: Optional[int] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.status_code = status_code
+        self.finished_at = time.time()
+        self.done.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "action": self.action,
+            "priority": self.priority,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_ms": round(((self.started_at or end) - self.submitted_at) * 1000, 2),
+            "run_ms": round((end - self.started_at) * 1000, 2) if self.started_at else None,
+            "result": self.result,
+            "error": self.error,
+            "status_code": self.status_code
+        }
+
+
+class JobQueue:
+    def __init__(
+        self,
+        runner: Callable[[Any], Awaitable[Dict[str, Any]]],
+        workers: int = 8,
+        max_queued: int = 1000,
+        max_jobs: int = 10000,
+        result_ttl: float = 3600
+    ):
+        self.runner = runner
+        self.worker_count = workers
+        self.max_queued = max_queued
+        self.max_jobs = max_jobs
+        self.result_ttl = result_ttl
+        self.queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.sequence = itertools.count()
+        self.workers: List[asyncio.Task] = []
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = {state: 0 for state in FINISHED_STATES}
+        self.expired = 0
+        self.evicted = 0
+
+    async def start(self):
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        for job in self.jobs.values():
+            if not job.finished:
+                job.finish("cancelled", error="Server shutting down")
+
+    def submit(self, action: str, payload: Any, priority: int = 0) -> Job:
+        self.prune()
+        if self.queued >= self.max_queued:
+            raise QueueFullError(f"Job queue is full ({self.max_queued} queued)")
+        job = Job(action, payload, priority)
+        self.jobs[job.id] = job
+        self.queue.put_nowait((-priority, next(self.sequence), job))
+        self.queued += 1
+        self.submitted += 1
+        self.evict_overflow()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.prune()
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        if not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def position(self, job: Job) -> Optional[int]:
+        if job.status != "queued":
+            return None
+        ahead = sum(
+            1 for _, _, other in self.queue._queue
+            if other.status == "queued" and (-other.priority, other.submitted_at) < (-job.priority, job.submitted_at)
+        )
+        return ahead + 1
+
+    def cancel(self, job: Job) -> bool:
+        if job.finished:
+            return False
+        if job.status == "queued":
+            self.queued -= 1
+            self.completed["cancelled"] += 1
+            job.finish("cancelled", error="Cancelled before start")
+        elif job.task:
+            job.cancel_requested = True
+            job.task.cancel()
+        return True
+
+    async def worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            if job.status != "queued":
+                continue
+            self.queued -= 1
+            self.running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            job.task = asyncio.ensure_future(self.runner(job.payload))
+            try:
+                result = await job.task
+                job.finish("succeeded", result=result, status_code=200)
+            except asyncio.CancelledError:
+                job.finish("cancelled", error="Cancelled while running")
+                if not job.cancel_requested:
+                    job.task.cancel()
+                    raise
+            except Exception as e:
+                job.finish(
+                    "failed",
+                    error=getattr(e, "detail", None) or str(e),
+                    status_code=getattr(e, "status_code", 500)
+                )
+            finally:
+                job.task = None
+                self.running -= 1
+                self.completed[job.status] += 1
+
+    def prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+        self.expired += len(expired)
+
+    def evict_overflow(self):
+        if len(self.jobs) <= self.max_jobs:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished]:
+            del self.jobs[job_id]
+            self.evicted += 1
+            if len(self.jobs) <= self.max_jobs:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.worker_count,
+            "queued": self.queued,
+            "running": self.running,
+            "stored": len(self.jobs),
+            "submitted": self.submitted,
+            "completed": dict(self.completed),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "max_queued": self.max_queued,
+            "result_ttl": self.result_ttl
+        }
@@ -1,15 +1,41 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, List, Any
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, List, Any, Tuple, Literal
 import asyncio
 import uuid
-import base64
+import time
 import json
 from datetime import datetime
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 import os
-from ai_browser import create_ai_session, execute_ai_command, ai_sessions
+from ai_browser import (
+    execute_ai_command, iter_ai_events, apply_ai_event, classify_ai_event,
+    new_ai_result, close_ai_client, ai_session_pool, AI_STREAM_TIMEOUT
+)
+from browser_shards import BrowserShard, ShardManager
+from browser_supervisor import BrowserSupervisor
+from session_reaper import SessionReaper
+from concurrency import ConcurrencyLimiter, parse_action_budgets
+from waits import LOAD_STATES, WaitMode, WaitParams, run_with_wait
+from response_cache import ResponseCache
+from extraction import EXTRACT_SCRIPT, ExtractField
+from content_stream import DEFAULT_CHUNK_SIZE, choose_encoding, encode_stream, iter_snapshot, render_content, response_headers, snapshot_content
+from content_stream import MEDIA_TYPES as CONTENT_MEDIA_TYPES
+from jobs import JobQueue, QueueFullError
+from event_bus import EventBus, split_filter
+from screencast import Screencast, ScreencastSettings
+from metrics import (
+    ACTIVE_SESSIONS, CONTENT_TYPE_LATEST, SESSIONS_CLOSED, SESSIONS_CREATED,
+    LoopLagMonitor, record_errors, render_metrics, timed, track_action
+)
+from tracing import record_span, should_trace, span, start_trace, trace_exporter
+from resource_monitor import SORT_KEYS, ResourceMonitor
+from state_store import StateStore, valid_state_name
+from crawler import CRAWL_MAX_URLS, CrawlRequest, Crawler, crawl_totals, iter_ndjson
+from resource_policy import ResourcePolicy, RequestInterceptor, default_policy, interception_totals
+from screenshots import MEDIA_TYPES, capture_screenshot, encode_screenshot, iter_chunks
+from action_registry import EmptyParams, register_action, get_action_handler, configure_rate_limits, action_stats
 
 app = FastAPI(
     title="🔨 𝙃𝘼𝙈𝙈𝙀𝙍 𝘼𝙐𝙏𝙊𝙈𝘼𝙏𝙄𝙊𝙉 𝘼𝙄",
@@ -19,8 +45,33 @@ app = FastAPI(
 
 active_sessions: Dict[str, Dict[str, Any]] = {}
 playwright_instance = None
-browser: Optional[Browser] = None
-live_connections: List[Any] = []
+shard_manager: Optional[ShardManager] = None
+session_reaper: Optional[SessionReaper] = None
+response_cache: Optional[ResponseCache] = None
+job_queue: Optional[JobQueue] = None
+resource_monitor: Optional[ResourceMonitor] = None
+browser_supervisor: Optional[BrowserSupervisor] = None
+state_store = StateStore(os.getenv("STATE_STORE_DIR", "states"))
+RESOURCE_TOP_N = int(os.getenv("RESOURCE_TOP_N", 5))
+event_bus = EventBus(
+    subscriber_queue=int(os.getenv("EVENT_SUBSCRIBER_QUEUE", 256)),
+    max_pending=int(os.getenv("EVENT_MAX_PENDING", 10000))
+)
+
+NAVIGATE_WAIT_UNTIL = os.getenv("NAVIGATE_WAIT_UNTIL", "networkidle")
+NAVIGATE_TIMEOUT = int(os.getenv("NAVIGATE_TIMEOUT", 60000))
+server_resource_policy = default_policy()
+concurrency_limiter = ConcurrencyLimiter(
+    global_limit=int(os.getenv("MAX_CONCURRENT_ACTIONS", 32)),
+    action_budgets=parse_action_budgets()
+)
+
+DISCONNECT_POLL_INTERVAL = 0.5
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", 60))
+SCREENCAST_MAX_STREAMS = int(os.getenv("SCREENCAST_MAX_STREAMS", 8))
+active_screencasts: Dict[int, Screencast] = {}
+loop_lag_monitor = LoopLagMonitor(float(os.getenv("LOOP_LAG_INTERVAL", 0.5)))
+ACTIVE_SESSIONS.set_function(lambda: len(active_sessions))
 
 class AutomationRequest(BaseModel):
     action: str = Field(description="Action: create, navigate, click, type, screenshot, execute, get_content, close, ai_command")
@@ -30,39 +81,156 @@ class AutomationRequest(BaseModel):
     text: Optional[str] = None
     script: Optional[str] = None
     full_page: bool = Field(default=False)
-    wait_time: Optional[int] = Field(default=1000)
+    wait_time: Optional[int] = None
     ai_prompt: Optional[str] = None
     x: Optional[int] = None
     y: Optional[int] = None
     direction: Optional[str] = None
+    format: Optional[str] = None
+    quality: Optional[int] = None
+    max_width: Optional[int] = None
+    max_height: Optional[int] = None
+    tile_height: Optional[int] = None
+    timeout: Optional[int] = None
+    wait_until: Optional[str] = None
+    wait_selector: Optional[str] = None
+    wait_url: Optional[str] = None
+    wait_function: Optional[str] = None
+    quiet_ms: Optional[int] = None
+    block_resource_types: Optional[List[str]] = None
+    block_url_patterns: Optional[List[str]] = None
+    block_domains: Optional[List[str]] = None
+    block_trackers: Optional[bool] = None
+    extract_schema: Optional[Dict[str, Any]] = None
+    mode: Optional[str] = None
+    debug_timing: bool = False
+    state_name: Optional[str] = None
+
+class JobRequest(AutomationRequest):
+    priority: int = Field(default=0, ge=-10, le=10)
+
+class ClipRegion(BaseModel):
+    x: float = Field(ge=0)
+    y: float = Field(ge=0)
+    width: float = Field(gt=0)
+    height: float = Field(gt=0)
+
+class ScreenshotStreamRequest(BaseModel):
+    session_id: str
+    format: Literal["png", "jpeg", "webp"] = "png"
+    quality: Optional[int] = Field(default=None, ge=1, le=100)
+    full_page: bool = False
+    clip: Optional[ClipRegion] = None
+    scale: float = Field(default=1.0, gt=0, le=4)
+
+class ContentStreamRequest(BaseModel):
+    session_id: str
+    mode: Literal["html", "text", "markdown"] = "html"
+    chunk_size: int = Field(default=DEFAULT_CHUNK_SIZE, ge=4096, le=4 * 1024 * 1024)
+
+class AiStreamRequest(BaseModel):
+    session_id: str
+    ai_prompt: str
+    timeout: Optional[int] = Field(default=None, gt=0)
+
+class BatchRequest(BaseModel):
+    session_id: Optional[str] = None
+    actions: List[AutomationRequest] = Field(min_length=1)
+    stop_on_error: bool = Field(default=True)
 
 @app.on_event("startup")
 async def startup_event():
-    global playwright_instance, browser
+    global playwright_instance, shard_manager, session_reaper, response_cache, job_queue, resource_monitor, browser_supervisor
     playwright_instance = await async_playwright().start()
-    browser = await playwright_instance.chromium.launch(
-        headless=True,
-        args=[
+    await asyncio.to_thread(state_store.load)
+    await event_bus.start()
+    await loop_lag_monitor.start()
+    await trace_exporter.start()
+    if os.getenv("RESPONSE_CACHE_DIR"):
+        response_cache = ResponseCache(
+            os.getenv("RESPONSE_CACHE_DIR"),
+            max_bytes=int(float(os.getenv("RESPONSE_CACHE_MAX_MB", 512)) * 1024 * 1024)
+        )
+        await asyncio.to_thread(response_cache.load)
+    shard_manager = ShardManager(
+        playwright_instance,
+        count=int(os.getenv("BROWSER_SHARDS", 1)),
+        launch_args=[
             '--no-sandbox',
             '--disable-setuid-sandbox',
             '--disable-dev-shm-usage',
             '--disable-blink-features=AutomationControlled'
-        ]
+        ],
+        context_factory=create_session_context,
+        pool_size=int(os.getenv("CONTEXT_POOL_SIZE", 2)),
+        pool_min_idle=int(os.getenv("CONTEXT_POOL_MIN_IDLE", 1)),
+        pool_max_idle=int(os.getenv("CONTEXT_POOL_MAX_IDLE", 4))
+    )
+    await shard_manager.start()
+    browser_supervisor = BrowserSupervisor(
+        shard_manager,
+        active_sessions,
+        restore_session,
+        interval=float(os.getenv("SUPERVISOR_INTERVAL", 5)),
+        snapshot_interval=float(os.getenv("SESSION_SNAPSHOT_INTERVAL", 30)),
+        backoff_initial=float(os.getenv("RELAUNCH_BACKOFF_INITIAL", 1)),
+        backoff_max=float(os.getenv("RELAUNCH_BACKOFF_MAX", 30))
+    )
+    await browser_supervisor.start()
+    session_reaper = SessionReaper(
+        active_sessions,
+        evict_session,
+        idle_ttl=float(os.getenv("SESSION_IDLE_TTL", 900)),
+        max_sessions=int(os.getenv("MAX_SESSIONS", 50)),
+        max_rss_bytes=int(float(os.getenv("MAX_BROWSER_RSS_MB", 0)) * 1024 * 1024),
+        rss_sampler=shard_manager.total_rss,
+        interval=float(os.getenv("REAPER_INTERVAL", 30)),
+        is_busy=concurrency_limiter.busy
+    )
+    await session_reaper.start()
+    resource_monitor = ResourceMonitor(
+        active_sessions,
+        lambda: [(shard.index, shard.pid) for shard in shard_manager.shards],
+        interval=float(os.getenv("RESOURCE_SAMPLE_INTERVAL", 15))
     )
+    await resource_monitor.start()
+    await ai_session_pool.start()
+    job_queue = JobQueue(
+        dispatch_action,
+        workers=int(os.getenv("JOB_WORKERS", 8)),
+        max_queued=int(os.getenv("JOB_MAX_QUEUED", 1000)),
+        max_jobs=int(os.getenv("JOB_MAX_STORED", 10000)),
+        result_ttl=float(os.getenv("JOB_RESULT_TTL", 3600))
+    )
+    await job_queue.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global browser, playwright_instance
+    global playwright_instance
+    if job_queue:
+        await job_queue.stop()
+    if session_reaper:
+        await session_reaper.stop()
+    if resource_monitor:
+        await resource_monitor.stop()
+    if browser_supervisor:
+        await browser_supervisor.stop()
     for session_id in list(active_sessions.keys()):
-        await close_session_internal(session_id)
-    if browser:
-        await browser.close()
+        await close_session_internal(session_id, "shutdown")
+    if shard_manager:
+        await shard_manager.close()
+    await ai_session_pool.stop()
+    await close_ai_client()
+    await event_bus.stop()
+    await loop_lag_monitor.stop()
+    await trace_exporter.stop()
     if playwright_instance:
         await playwright_instance.stop()
 
-async def close_session_internal(session_id: str):
-    if session_id in active_sessions:
-        session = active_sessions[session_id]
+async def close_session_internal(session_id: str, reason: str = "closed"):
+    session = active_sessions.pop(session_id, None)
+    if session is not None:
+        SESSIONS_CLOSED.labels(reason).inc()
         try:
             if session.get('page'):
                 await session['page'].close()
@@ -70,13 +238,32 @@ async def close_session_internal(session_id: str):
                 await session['context'].close()
         except:
             pass
-        del active_sessions[session_id]
+    if shard_manager:
+        shard_manager.release(session_id)
+    ai_session_pool.release(session_id)
+    concurrency_limiter.discard(session_id)
+    if resource_monitor:
+        resource_monitor.discard(session_id)
 
 def get_session(session_id: str) -> Dict[str, Any]:
-    if session_id not in active_sessions:
+    shard = shard_manager.owner(session_id) if shard_manager else None
+    if session_id not in active_sessions or shard is None:
         raise HTTPException(status_code=404, detail=f"❌ Session {session_id} not found")
+    if not shard.is_running():
+        raise HTTPException(status_code=503, detail=f"❌ Browser shard {shard.index} is not running")
+    if session_reaper:
+        session_reaper.touch(session_id)
     return active_sessions[session_id]
 
+async def evict_session(session_id: str, reason: str):
+    await close_session_internal(session_id, f"evicted_{reason}")
+    event_bus.publish({
+        "type": "session_evicted",
+        "session_id": session_id,
+        "reason": reason,
+        "timestamp": datetime.now().isoformat()
+    })
+
 async def inject_stealth_scripts(page: Page):
     await page.add_init_script("""
         Object.defineProperty(navigator, 'webdriver', {
@@ -93,12 +280,96 @@ async def inject_stealth_scripts(page: Page):
         };
     """)
 
-async def broadcast_event(event_data: dict):
-    for connection in live_connections[:]:
+async def create_session_context(browser: Browser, storage_state: Optional[Dict[str, Any]] = None) -> Tuple[BrowserContext, Page]:
+    context = await timed("new_context", browser.new_context(
+        viewport={'width': 1920, 'height': 1080},
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        storage_state=storage_state
+    ))
+    try:
+        page = await timed("new_page", context.new_page())
+        await inject_stealth_scripts(page)
+    except BaseException:
+        await asyncio.shield(context.close())
+        raise
+    return context, page
+
+async def restore_session(session_id: str, shard: BrowserShard) -> bool:
+    session = active_sessions.get(session_id)
+    if session is None:
+        return False
+    try:
+        context, page = await create_session_context(shard.browser, session.get('storage_state'))
+        if response_cache:
+            await response_cache.install(context)
+        interceptor = session['interceptor']
+        interceptor.installed = False
+        await interceptor.install(context)
+    except Exception as e:
+        print(f"Session Restore Error: {e}")
+        await evict_session(session_id, "crash")
+        return False
+    
+    session['context'] = context
+    session['page'] = page
+    session['restored_at'] = datetime.now().isoformat()
+    if resource_monitor:
+        resource_monitor.discard(session_id)
+    last_url = session.get('last_url')
+    if last_url and last_url != 'about:blank':
         try:
-            await connection.send_json(event_data)
-        except:
-            live_connections.remove(connection)
+            await page.goto(last_url, wait_until='domcontentloaded', timeout=NAVIGATE_TIMEOUT)
+        except Exception as e:
+            session['restore_error'] = str(e)
+    
+    event_bus.publish({
+        "type": "session_restored",
+        "session_id": session_id,
+        "url": last_url,
+        "shard": shard.index,
+        "timestamp": datetime.now().isoformat()
+    })
+    return True
+
+async def open_crawl_page(policy: ResourcePolicy) -> Tuple[Tuple[str, BrowserContext], Page]:
+    worker_id = f"crawl-{uuid.uuid4()}"
+    shard, context, page = await shard_manager.acquire(worker_id)
+    try:
+        if response_cache:
+            await response_cache.install(context)
+        await RequestInterceptor(policy).install(context)
+    except Exception:
+        await close_crawl_page((worker_id, context))
+        raise
+    return (worker_id, context), page
+
+async def close_crawl_page(handle: Tuple[str, BrowserContext]):
+    worker_id, context = handle
+    shard_manager.release(worker_id)
+    await context.close()
+
+async def cancel_on_disconnect(http_request: Request, coro):
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="❌ Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+async def ensure_ai_session(session_id: str) -> str:
+    ai_session_id = await ai_session_pool.acquire(session_id)
+    if not ai_session_id:
+        raise HTTPException(status_code=500, detail="❌ Failed to create AI session")
+    return ai_session_id
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -441,7 +712,7 @@ async def root():
                     <div class="stat-label">🎯 𝘼𝙘𝙩𝙞𝙫𝙚 𝙎𝙚𝙨𝙨𝙞𝙤𝙣𝙨</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-number">""" + str(len(ai_sessions)) + """</div>
+                    <div class="stat-number">""" + str(len(ai_session_pool)) + """</div>
                     <div class="stat-label">🤖 𝘼𝙄 𝙎𝙚𝙨𝙨𝙞𝙤𝙣𝙨</div>
                 </div>
                 <div class="stat-card">
@@ -627,7 +898,7 @@ async def root():
                 const event = document.createElement('div');
                 event.className = 'stream-event';
                 const timestamp = new Date().toLocaleTimeString();
-                event.innerHTML = `[${timestamp}] ${message}`;
+                event.textContent = `[${timestamp}] ${message}`;
                 streamContent.appendChild(event);
                 streamContent.scrollTop = streamContent.scrollHeight;
                 
@@ -636,289 +907,852 @@ async def root():
                 }
             }
             
-            setInterval(() => {
-                fetch('/api/health')
-                    .then(r => r.json())
-                    .then(data => {
-                        if (data.last_activity) {
-                            addStreamEvent(`💚 ${data.last_activity}`);
-                        }
-                    })
-                    .catch(() => {});
-            }, 5000);
+            function connectStream() {
+                const protocol = location.protocol === 'https:' ? 'wss:' : 'ws:';
+                const socket = new WebSocket(`${protocol}//${location.host}/ws/events`);
+                socket.onopen = () => addStreamEvent('✅ 𝘾𝙤𝙣𝙣𝙚𝙘𝙩𝙚𝙙 𝙩𝙤 𝙡𝙞𝙫𝙚 𝙨𝙩𝙧𝙚𝙖𝙢');
+                socket.onmessage = (message) => {
+                    const data = JSON.parse(message.data);
+                    if (data.type === 'events_dropped') {
+                        addStreamEvent(`⚠️ ${data.count} events dropped`);
+                        return;
+                    }
+                    const detail = data.url || data.reason || data.session_id || '';
+                    addStreamEvent(`⚡ ${data.type} ${detail}`);
+                };
+                socket.onclose = () => setTimeout(connectStream, 5000);
+            }
             
-            addStreamEvent('✅ 𝘾𝙤𝙣𝙣𝙚𝙘𝙩𝙚𝙙 𝙩𝙤 𝙡𝙞𝙫𝙚 𝙨𝙩𝙧𝙚𝙖𝙢');
+            connectStream();
         </script>
     </body>
     </html>
     """
     return HTMLResponse(content=html_content)
 
+@app.websocket("/ws/events")
+async def events_websocket(websocket: WebSocket, session_id: Optional[str] = None, types: Optional[str] = None):
+    await websocket.accept()
+    subscriber = event_bus.subscribe(split_filter(session_id), split_filter(types))
+    
+    async def send_events():
+        while True:
+            event = await subscriber.next()
+            if event is None:
+                return
+            await websocket.send_json(event)
+    
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            if isinstance(message, dict):
+                subscriber.set_filters(message.get("session_ids"), message.get("types"))
+    
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_filters())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        event_bus.unsubscribe(subscriber)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@app.websocket("/ws/screencast/{session_id}")
+async def screencast_websocket(websocket: WebSocket, session_id: str):
+    await websocket.accept()
+    try:
+        session = get_session(session_id)
+        settings = ScreencastSettings(**websocket.query_params)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code, reason=e.detail)
+        return
+    except ValueError as e:
+        await websocket.close(code=4400, reason=str(e)[:120])
+        return
+    if len(active_screencasts) >= SCREENCAST_MAX_STREAMS:
+        await websocket.close(code=4429, reason="Too many screencasts")
+        return
+    
+    screencast = Screencast(session['page'], settings)
+    active_screencasts[id(screencast)] = screencast
+    
+    async def send_frames():
+        while True:
+            started = time.monotonic()
+            frame = await screencast.next_frame()
+            if frame is None:
+                return
+            await websocket.send_bytes(frame)
+            if session_reaper:
+                session_reaper.touch(session_id)
+            delay = 1 / screencast.settings.fps - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+    
+    async def receive_settings():
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict):
+                continue
+            try:
+                await screencast.update(ScreencastSettings(**{**screencast.settings.model_dump(), **message}))
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+                continue
+            await websocket.send_json({"type": "stats", **screencast.stats()})
+    
+    tasks = []
+    try:
+        await screencast.start()
+        await websocket.send_json({"type": "started", "session_id": session_id, **screencast.stats()})
+        tasks = [asyncio.create_task(send_frames()), asyncio.create_task(receive_settings())]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except Exception as e:
+        print(f"Screencast Error: {e}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await screencast.stop()
+        active_screencasts.pop(id(screencast), None)
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+
+@app.get("/api/admin/resources")
+async def admin_resources_endpoint(top: int = 10, sort: str = "cpu", refresh: bool = False):
+    if not resource_monitor:
+        raise HTTPException(status_code=503, detail="❌ Resource monitor is not running")
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"❌ sort must be one of: {', '.join(SORT_KEYS)}")
+    if refresh:
+        await resource_monitor.refresh()
+    top = max(1, min(top, 100))
+    return {
+        "success": True,
+        "sessions": resource_monitor.top_sessions(top, sort),
+        "processes": resource_monitor.process_summary(),
+        "top_processes": resource_monitor.top_processes(top),
+        "samples": resource_monitor.samples,
+        "last_sample_ms": resource_monitor.last_sample_ms,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/api/health")
 async def health_check():
+    if shard_manager:
+        await shard_manager.sample_rss()
     return {
         "status": "healthy",
         "emoji": "💚",
-        "browser_running": browser is not None,
+        "browser_running": shard_manager is not None and shard_manager.is_running(),
         "active_sessions": len(active_sessions),
-        "ai_sessions": len(ai_sessions),
+        "ai_sessions": len(ai_session_pool),
+        "ai_session_pool": ai_session_pool.stats(),
+        "session_reaper": session_reaper.stats() if session_reaper else None,
+        "concurrency": concurrency_limiter.stats(),
+        "crawl": crawl_totals.stats(),
+        "jobs": job_queue.stats() if job_queue else None,
+        "events": event_bus.stats(),
+        "tracing": trace_exporter.stats(),
+        "resources": resource_monitor.stats(RESOURCE_TOP_N) if resource_monitor else None,
+        "supervisor": browser_supervisor.stats() if browser_supervisor else None,
+        "states": state_store.stats(),
+        "screencasts": [screencast.stats() for screencast in active_screencasts.values()],
+        "response_cache": response_cache.stats() if response_cache else None,
+        "interception": {
+            "default_policy": server_resource_policy.model_dump(),
+            "totals": interception_totals.snapshot()
+        },
+        "shards": shard_manager.stats() if shard_manager else [],
         "timestamp": datetime.now().isoformat(),
         "message": "✅ 𝙎𝙚𝙧𝙫𝙞𝙘𝙚 𝙞𝙨 𝙧𝙪𝙣𝙣𝙞𝙣𝙜 𝙨𝙢𝙤𝙤𝙩𝙝𝙡𝙮"
     }
 
+class CreateParams(ResourcePolicy):
+    pass
+
+class StateParams(BaseModel):
+    state_name: str
+
+    @field_validator("state_name")
+    @classmethod
+    def check_state_name(cls, state_name: str) -> str:
+        if not valid_state_name(state_name):
+            raise ValueError("state_name must be 1-64 letters, digits, '_', '.' or '-' and not '.' or '..'")
+        return state_name
+
+class CreateFromStateParams(CreateParams, StateParams):
+    pass
+
+class NavigateParams(WaitParams):
+    url: str
+    wait_until: Optional[WaitMode] = NAVIGATE_WAIT_UNTIL
+
+class SelectorClickParams(WaitParams):
+    selector: str
+    wait_time: int = Field(default=1000, ge=0)
+
+class PointParams(BaseModel):
+    x: int
+    y: int
+
+class PointClickParams(PointParams, WaitParams):
+    wait_time: int = Field(default=1000, ge=0)
+
+class WaitActionParams(WaitParams):
+    wait_time: int = Field(default=0, ge=0)
+
+class WaitFiveSecondsParams(WaitActionParams):
+    wait_time: int = Field(default=5000, ge=0)
+
+class TypeParams(BaseModel):
+    selector: str
+    text: str
+
+class TypeAtParams(PointParams):
+    text: str
+
+class ScreenshotParams(BaseModel):
+    full_page: bool = False
+    format: Literal["png", "jpeg", "webp"] = "png"
+    quality: Optional[int] = Field(default=None, ge=1, le=100)
+    max_width: Optional[int] = Field(default=None, gt=0)
+    max_height: Optional[int] = Field(default=None, gt=0)
+    tile_height: Optional[int] = Field(default=None, ge=256)
+
+class ExecuteParams(BaseModel):
+    script: str
+
+class ScrollDocumentParams(BaseModel):
+    direction: Literal["up", "down", "left", "right"] = "down"
+
+class KeyCombinationParams(BaseModel):
+    text: str
+
+class ContentParams(BaseModel):
+    mode: Literal["html", "text", "markdown"] = "html"
+
+class ExtractParams(BaseModel):
+    extract_schema: Dict[str, ExtractField] = Field(min_length=1)
+
+class AiCommandParams(BaseModel):
+    ai_prompt: str
+    timeout: Optional[int] = Field(default=None, gt=0)
+
+async def open_session(policy: ResourcePolicy, storage_state: Optional[Dict[str, Any]] = None) -> str:
+    session_id = str(uuid.uuid4())
+    if session_reaper:
+        await session_reaper.make_room()
+    shard, context, page = await shard_manager.acquire(session_id, storage_state)
+    interceptor = RequestInterceptor(server_resource_policy.merged(policy))
+    try:
+        if response_cache:
+            await response_cache.install(context)
+        await interceptor.install(context)
+    except BaseException:
+        shard_manager.release(session_id)
+        await asyncio.shield(context.close())
+        raise
+    
+    active_sessions[session_id] = {
+        'context': context,
+        'page': page,
+        'interceptor': interceptor,
+        'shard': shard.index,
+        'storage_state': storage_state,
+        'created_at': datetime.now().isoformat(),
+        'last_activity': time.monotonic()
+    }
+    SESSIONS_CREATED.inc()
+    
+    event_bus.publish({
+        "type": "session_created",
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat()
+    })
+    return session_id
+
+@register_action("create", CreateParams, requires_session=False)
+async def create_action(params: CreateParams, session_id: Optional[str], session: Optional[Dict[str, Any]]):
+    session_id = await open_session(params)
+    return {
+        "success": True,
+        "action": "create",
+        "session_id": session_id,
+        "message": "✅ 𝙎𝙚𝙨𝙨𝙞𝙤𝙣 𝙘𝙧𝙚𝙖𝙩𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
+    }
+
+@register_action("create_from_state", CreateFromStateParams, requires_session=False)
+async def create_from_state_action(params: CreateFromStateParams, session_id: Optional[str], session: Optional[Dict[str, Any]]):
+    record = state_store.get(params.state_name)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"❌ State {params.state_name} not found")
+    session_id = await open_session(params, record["state"])
+    return {
+        "success": True,
+        "action": "create_from_state",
+        "session_id": session_id,
+        "state": state_store.describe(record),
+        "message": "✅ 𝙎𝙚𝙨𝙨𝙞𝙤𝙣 𝙧𝙚𝙨𝙩𝙤𝙧𝙚𝙙 𝙛𝙧𝙤𝙢 𝙨𝙩𝙖𝙩𝙚"
+    }
+
+@register_action("save_state", StateParams)
+async def save_state_action(params: StateParams, session_id: str, session: Dict[str, Any]):
+    state = await timed("storage_state", session['context'].storage_state())
+    session['storage_state'] = state
+    saved = await state_store.save(params.state_name, state, session['page'].url)
+    return {
+        "success": True,
+        "action": "save_state",
+        "state": saved,
+        "message": "💾 𝙎𝙩𝙖𝙩𝙚 𝙨𝙖𝙫𝙚𝙙"
+    }
+
+@register_action("navigate", NavigateParams)
+async def navigate_action(params: NavigateParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    interceptor = session['interceptor']
+    blocked_before = interceptor.stats.snapshot()
+    goto_wait = params.wait_until if params.wait_until in LOAD_STATES else 'commit'
+    wait_ms = await run_with_wait(
+        page,
+        params,
+        lambda: timed("goto", page.goto(params.url, wait_until=goto_wait, timeout=params.timeout or NAVIGATE_TIMEOUT))
+    )
+    title = await timed("title", page.title())
+    
+    event_bus.publish({
+        "type": "navigation",
+        "session_id": session_id,
+        "url": params.url,
+        "title": title,
+        "timestamp": datetime.now().isoformat()
+    })
+    
+    return {
+        "success": True,
+        "action": "navigate",
+        "url": params.url,
+        "title": title,
+        "wait_until": params.wait_until,
+        "wait_ms": wait_ms,
+        "blocked": interceptor.delta(blocked_before),
+        "message": "✅ 𝙉𝙖𝙫𝙞𝙜𝙖𝙩𝙞𝙤𝙣 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
+    }
+
+@register_action("click", SelectorClickParams)
+async def click_action(params: SelectorClickParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    wait_ms = await run_with_wait(page, params, lambda: timed("click", page.click(params.selector)), params.wait_time)
+    return {
+        "success": True,
+        "action": "click",
+        "selector": params.selector,
+        "wait_ms": wait_ms,
+        "message": "✅ 𝘾𝙡𝙞𝙘𝙠 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
+    }
+
+@register_action("click_at", PointClickParams)
+async def click_at_action(params: PointClickParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    wait_ms = await run_with_wait(page, params, lambda: timed("mouse.click", page.mouse.click(params.x, params.y)), params.wait_time)
+    return {
+        "success": True,
+        "action": "click_at",
+        "x": params.x,
+        "y": params.y,
+        "wait_ms": wait_ms,
+        "message": f"✅ 𝘾𝙡𝙞𝙘𝙠𝙚𝙙 𝙖𝙩 ({params.x}, {params.y})"
+    }
+
+@register_action("hover_at", PointParams)
+async def hover_at_action(params: PointParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    await timed("mouse.move", page.mouse.move(params.x, params.y))
+    return {
+        "success": True,
+        "action": "hover_at",
+        "x": params.x,
+        "y": params.y,
+        "message": f"✅ 𝙃𝙤𝙫𝙚𝙧𝙚𝙙 𝙖𝙩 ({params.x}, {params.y})"
+    }
+
+@register_action("type", TypeParams)
+async def type_action(params: TypeParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    await timed("fill", page.fill(params.selector, params.text))
+    return {
+        "success": True,
+        "action": "type",
+        "selector": params.selector,
+        "message": "✅ 𝙏𝙚𝙭𝙩 𝙞𝙣𝙥𝙪𝙩 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
+    }
+
+@register_action("type_text_at", TypeAtParams)
+async def type_text_at_action(params: TypeAtParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    await timed("mouse.click", page.mouse.click(params.x, params.y))
+    await timed("keyboard.type", page.keyboard.type(params.text))
+    return {
+        "success": True,
+        "action": "type_text_at",
+        "x": params.x,
+        "y": params.y,
+        "text": params.text,
+        "message": f"✅ 𝙏𝙮𝙥𝙚𝙙 𝙩𝙚𝙭𝙩 𝙖𝙩 ({params.x}, {params.y})"
+    }
+
+@register_action("screenshot", ScreenshotParams)
+async def screenshot_action(params: ScreenshotParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    screenshot_bytes = await timed("screenshot", page.screenshot(full_page=params.full_page))
+    encoded = await encode_screenshot(
+        screenshot_bytes,
+        image_format=params.format,
+        quality=params.quality,
+        max_width=params.max_width,
+        max_height=params.max_height,
+        tile_height=params.tile_height
+    )
+    response = {
+        "success": True,
+        "action": "screenshot",
+        "format": params.format,
+        "width": encoded["width"],
+        "height": encoded["height"],
+        "encode_ms": encoded["encode_ms"],
+        "message": "📸 𝙎𝙘𝙧𝙚𝙚𝙣𝙨𝙝𝙤𝙩 𝙘𝙖𝙥𝙩𝙪𝙧𝙚𝙙"
+    }
+    if len(encoded["images"]) > 1:
+        response["tiles"] = encoded["images"]
+    else:
+        response["screenshot"] = encoded["images"][0]
+    return response
+
+@register_action("execute", ExecuteParams)
+async def execute_action(params: ExecuteParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    result = await timed("evaluate", page.evaluate(params.script))
+    return {
+        "success": True,
+        "action": "execute",
+        "result": result,
+        "message": "⚙️ 𝙎𝙘𝙧𝙞𝙥𝙩 𝙚𝙭𝙚𝙘𝙪𝙩𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
+    }
+
+SCROLL_SCRIPTS = {
+    "down": "window.scrollBy(0, window.innerHeight)",
+    "up": "window.scrollBy(0, -window.innerHeight)",
+    "left": "window.scrollBy(-window.innerWidth, 0)",
+    "right": "window.scrollBy(window.innerWidth, 0)"
+}
+
+@register_action("scroll_document", ScrollDocumentParams)
+async def scroll_document_action(params: ScrollDocumentParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    await timed("evaluate", page.evaluate(SCROLL_SCRIPTS[params.direction]))
+    return {
+        "success": True,
+        "action": "scroll_document",
+        "direction": params.direction,
+        "message": f"✅ 𝙎𝙘𝙧𝙤𝙡𝙡𝙚𝙙 {params.direction}"
+    }
+
+@register_action("scroll_at", PointParams)
+async def scroll_at_action(params: PointParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    await timed("mouse.move", page.mouse.move(params.x, params.y))
+    await timed("mouse.wheel", page.mouse.wheel(0, 100))
+    return {
+        "success": True,
+        "action": "scroll_at",
+        "x": params.x,
+        "y": params.y,
+        "message": f"✅ 𝙎𝙘𝙧𝙤𝙡𝙡𝙚𝙙 𝙖𝙩 ({params.x}, {params.y})"
+    }
+
+@register_action("go_back")
+async def go_back_action(params: EmptyParams, session_id: str, session: Dict[str, Any]):
+    await timed("go_back", session['page'].go_back())
+    return {
+        "success": True,
+        "action": "go_back",
+        "message": "✅ 𝙒𝙚𝙣𝙩 𝙗𝙖𝙘𝙠"
+    }
+
+@register_action("go_forward")
+async def go_forward_action(params: EmptyParams, session_id: str, session: Dict[str, Any]):
+    await timed("go_forward", session['page'].go_forward())
+    return {
+        "success": True,
+        "action": "go_forward",
+        "message": "✅ 𝙒𝙚𝙣𝙩 𝙛𝙤𝙧𝙬𝙖𝙧𝙙"
+    }
+
+async def noop():
+    pass
+
+@register_action("wait_5_seconds", WaitFiveSecondsParams)
+async def wait_5_seconds_action(params: WaitFiveSecondsParams, session_id: str, session: Dict[str, Any]):
+    wait_ms = await run_with_wait(session['page'], params, noop, params.wait_time)
+    return {
+        "success": True,
+        "action": "wait_5_seconds",
+        "wait_until": params.wait_until,
+        "wait_ms": wait_ms,
+        "message": f"✅ 𝙒𝙖𝙞𝙩𝙚𝙙 {wait_ms}𝙢𝙨"
+    }
+
+@register_action("wait", WaitActionParams)
+async def wait_action(params: WaitActionParams, session_id: str, session: Dict[str, Any]):
+    wait_ms = await run_with_wait(session['page'], params, noop, params.wait_time)
+    return {
+        "success": True,
+        "action": "wait",
+        "wait_until": params.wait_until,
+        "wait_ms": wait_ms,
+        "message": f"✅ 𝙒𝙖𝙞𝙩𝙚𝙙 {wait_ms}𝙢𝙨"
+    }
+
+@register_action("key_combination", KeyCombinationParams)
+async def key_combination_action(params: KeyCombinationParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    keys = params.text.split('+')
+    for key in keys:
+        await timed("keyboard.down", page.keyboard.down(key.strip()))
+    for key in reversed(keys):
+        await timed("keyboard.up", page.keyboard.up(key.strip()))
+    return {
+        "success": True,
+        "action": "key_combination",
+        "keys": params.text,
+        "message": f"✅ 𝙋𝙧𝙚𝙨𝙨𝙚𝙙 {params.text}"
+    }
+
+@register_action("ai_command", AiCommandParams)
+async def ai_command_action(params: AiCommandParams, session_id: str, session: Dict[str, Any]):
+    ai_session_id = await ensure_ai_session(session_id)
+    result = await execute_ai_command(
+        ai_session_id,
+        params.ai_prompt,
+        timeout=params.timeout / 1000 if params.timeout else None
+    )
+    
+    return {
+        "success": result["success"],
+        "action": "ai_command",
+        "prompt": params.ai_prompt,
+        "thoughts": result.get("thoughts", []),
+        "final_message": result.get("final_message", ""),
+        "summary": result.get("summary", ""),
+        "error": result.get("error"),
+        "message": "🤖 𝘼𝙄 𝙘𝙤𝙢𝙢𝙖𝙣𝙙 𝙚𝙭𝙚𝙘𝙪𝙩𝙚𝙙"
+    }
+
+@register_action("get_content", ContentParams)
+async def get_content_action(params: ContentParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    if params.mode == "html":
+        content = await timed("content", page.content())
+    else:
+        content = await timed("render_content", render_content(page, params.mode))
+    url = page.url
+    title = await timed("title", page.title())
+    return {
+        "success": True,
+        "action": "get_content",
+        "mode": params.mode,
+        "content": content,
+        "url": url,
+        "title": title,
+        "message": "📄 𝘾𝙤𝙣𝙩𝙚𝙣𝙩 𝙧𝙚𝙩𝙧𝙞𝙚𝙫𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
+    }
+
+@register_action("extract", ExtractParams)
+async def extract_action(params: ExtractParams, session_id: str, session: Dict[str, Any]):
+    page = session['page']
+    schema = {name: field.model_dump(exclude_none=True) for name, field in params.extract_schema.items()}
+    data = await timed("evaluate", page.evaluate(EXTRACT_SCRIPT, schema))
+    return {
+        "success": True,
+        "action": "extract",
+        "url": page.url,
+        "data": data,
+        "message": "📦 𝘿𝙖𝙩𝙖 𝙚𝙭𝙩𝙧𝙖𝙘𝙩𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
+    }
+
+@register_action("close")
+async def close_action(params: EmptyParams, session_id: str, session: Dict[str, Any]):
+    await close_session_internal(session_id)
+    
+    event_bus.publish({
+        "type": "session_closed",
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat()
+    })
+    
+    return {
+        "success": True,
+        "action": "close",
+        "session_id": session_id,
+        "message": "✅ 𝙎𝙚𝙨𝙨𝙞𝙤𝙣 𝙘𝙡𝙤𝙨𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
+    }
+
+configure_rate_limits()
+
+async def dispatch_action(request: AutomationRequest) -> Dict[str, Any]:
+    action = request.action.lower()
+    handler = get_action_handler(action)
+    if not handler:
+        raise HTTPException(status_code=400, detail=f"❌ Unknown action: {action}")
+    
+    with record_errors(action), start_trace(action, should_trace(request.debug_timing), session_id=request.session_id) as trace:
+        session_id = None
+        if handler.requires_session:
+            if not request.session_id:
+                raise HTTPException(status_code=400, detail="❌ session_id required")
+            session_id = request.session_id
+            get_session(session_id)
+    
+        params = handler.parse(request.model_dump())
+        queued_at = time.perf_counter()
+        async with concurrency_limiter.slot(session_id, action):
+            record_span("queue", queued_at)
+            async with track_action(action, queued_at):
+                session = get_session(session_id) if session_id else None
+                with span("handler", action=action):
+                    result = await handler(params, request.session_id, session)
+                if session and session_id in active_sessions and not session['page'].is_closed():
+                    session['last_url'] = session['page'].url
+        if trace and request.debug_timing:
+            result["timing"] = trace.to_dict()
+        return result
+
 @app.post("/api/automation")
-async def automation_endpoint(request: AutomationRequest):
+async def automation_endpoint(request: AutomationRequest, http_request: Request):
     try:
-        action = request.action.lower()
-        
-        if action == "create":
-            session_id = str(uuid.uuid4())
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        return await cancel_on_disconnect(http_request, dispatch_action(request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"❌ Error: {str(e)}")
+
+def get_job(job_id: str):
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"❌ Job {job_id} not found")
+    return job
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job_endpoint(request: JobRequest):
+    action = request.action.lower()
+    if not get_action_handler(action):
+        raise HTTPException(status_code=400, detail=f"❌ Unknown action: {action}")
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="❌ Job queue is not running")
+    try:
+        job = job_queue.submit(action, AutomationRequest(**request.model_dump(exclude={"priority"})), request.priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"❌ {e}")
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "position": job_queue.position(job),
+        "message": "📥 𝙅𝙤𝙗 𝙦𝙪𝙚𝙪𝙚𝙙"
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_endpoint(job_id: str, wait: float = 0):
+    job = await job_queue.wait(get_job(job_id), min(max(wait, 0), JOB_MAX_WAIT))
+    return {
+        "success": True,
+        **job.snapshot(),
+        "position": job_queue.position(job)
+    }
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job_endpoint(job_id: str):
+    job = get_job(job_id)
+    if not job_queue.cancel(job):
+        raise HTTPException(status_code=409, detail=f"❌ Job {job_id} already {job.status}")
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "message": "🛑 𝙅𝙤𝙗 𝙘𝙖𝙣𝙘𝙚𝙡𝙡𝙚𝙙"
+    }
+
+@app.get("/api/states")
+async def list_states_endpoint():
+    return {
+        "success": True,
+        "states": state_store.list()
+    }
+
+@app.delete("/api/states/{state_name}")
+async def delete_state_endpoint(state_name: str):
+    if not valid_state_name(state_name) or not await state_store.delete(state_name):
+        raise HTTPException(status_code=404, detail=f"❌ State {state_name} not found")
+    return {
+        "success": True,
+        "state_name": state_name,
+        "message": "🗑️ 𝙎𝙩𝙖𝙩𝙚 𝙙𝙚𝙡𝙚𝙩𝙚𝙙"
+    }
+
+@app.get("/api/actions")
+async def actions_endpoint():
+    return {
+        "success": True,
+        "actions": action_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/api/screenshot")
+async def screenshot_stream_endpoint(request: ScreenshotStreamRequest):
+    get_session(request.session_id)
+    try:
+        async with concurrency_limiter.slot(request.session_id, "screenshot"):
+            session = get_session(request.session_id)
+            image = await capture_screenshot(
+                session['page'],
+                image_format=request.format,
+                quality=request.quality,
+                full_page=request.full_page,
+                clip=request.clip.model_dump() if request.clip else None,
+                scale=request.scale
             )
-            page = await context.new_page()
-            await inject_stealth_scripts(page)
-            
-            active_sessions[session_id] = {
-                'context': context,
-                'page': page,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            await broadcast_event({
-                "type": "session_created",
-                "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return {
-                "success": True,
-                "action": "create",
-                "session_id": session_id,
-                "message": "✅ 𝙎𝙚𝙨𝙨𝙞𝙤𝙣 𝙘𝙧𝙚𝙖𝙩𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
-            }
-        
-        if not request.session_id:
-            raise HTTPException(status_code=400, detail="❌ session_id required")
-        
-        session = get_session(request.session_id)
-        page = session['page']
-        
-        if action == "navigate":
-            await page.goto(request.url, wait_until='networkidle', timeout=60000)
-            title = await page.title()
-            
-            await broadcast_event({
-                "type": "navigation",
-                "url": request.url,
-                "title": title,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return {
-                "success": True,
-                "action": "navigate",
-                "url": request.url,
-                "title": title,
-                "message": "✅ 𝙉𝙖𝙫𝙞𝙜𝙖𝙩𝙞𝙤𝙣 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
-            }
-        
-        elif action == "click":
-            await page.click(request.selector)
-            await asyncio.sleep(request.wait_time / 1000)
-            return {
-                "success": True,
-                "action": "click",
-                "selector": request.selector,
-                "message": "✅ 𝘾𝙡𝙞𝙘𝙠 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
-            }
-        
-        elif action == "click_at":
-            await page.mouse.click(request.x, request.y)
-            await asyncio.sleep(request.wait_time / 1000)
-            return {
-                "success": True,
-                "action": "click_at",
-                "x": request.x,
-                "y": request.y,
-                "message": f"✅ 𝘾𝙡𝙞𝙘𝙠𝙚𝙙 𝙖𝙩 ({request.x}, {request.y})"
-            }
-        
-        elif action == "hover_at":
-            await page.mouse.move(request.x, request.y)
-            return {
-                "success": True,
-                "action": "hover_at",
-                "x": request.x,
-                "y": request.y,
-                "message": f"✅ 𝙃𝙤𝙫𝙚𝙧𝙚𝙙 𝙖𝙩 ({request.x}, {request.y})"
-            }
-        
-        elif action == "type":
-            await page.fill(request.selector, request.text)
-            return {
-                "success": True,
-                "action": "type",
-                "selector": request.selector,
-                "message": "✅ 𝙏𝙚𝙭𝙩 𝙞𝙣𝙥𝙪𝙩 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡"
-            }
-        
-        elif action == "type_text_at":
-            await page.mouse.click(request.x, request.y)
-            await page.keyboard.type(request.text)
-            return {
-                "success": True,
-                "action": "type_text_at",
-                "x": request.x,
-                "y": request.y,
-                "text": request.text,
-                "message": f"✅ 𝙏𝙮𝙥𝙚𝙙 𝙩𝙚𝙭𝙩 𝙖𝙩 ({request.x}, {request.y})"
-            }
-        
-        elif action == "screenshot":
-            screenshot_bytes = await page.screenshot(full_page=request.full_page)
-            screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
-            return {
-                "success": True,
-                "action": "screenshot",
-                "screenshot": screenshot_b64,
-                "message": "📸 𝙎𝙘𝙧𝙚𝙚𝙣𝙨𝙝𝙤𝙩 𝙘𝙖𝙥𝙩𝙪𝙧𝙚𝙙"
-            }
-        
-        elif action == "execute":
-            result = await page.evaluate(request.script)
-            return {
-                "success": True,
-                "action": "execute",
-                "result": result,
-                "message": "⚙️ 𝙎𝙘𝙧𝙞𝙥𝙩 𝙚𝙭𝙚𝙘𝙪𝙩𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
-            }
-        
-        elif action == "scroll_document":
-            direction = request.direction or "down"
-            if direction == "down":
-                await page.evaluate("window.scrollBy(0, window.innerHeight)")
-            elif direction == "up":
-                await page.evaluate("window.scrollBy(0, -window.innerHeight)")
-            elif direction == "left":
-                await page.evaluate("window.scrollBy(-window.innerWidth, 0)")
-            elif direction == "right":
-                await page.evaluate("window.scrollBy(window.innerWidth, 0)")
-            
-            return {
-                "success": True,
-                "action": "scroll_document",
-                "direction": direction,
-                "message": f"✅ 𝙎𝙘𝙧𝙤𝙡𝙡𝙚𝙙 {direction}"
-            }
-        
-        elif action == "scroll_at":
-            await page.mouse.move(request.x, request.y)
-            await page.mouse.wheel(0, 100)
-            return {
-                "success": True,
-                "action": "scroll_at",
-                "x": request.x,
-                "y": request.y,
-                "message": f"✅ 𝙎𝙘𝙧𝙤𝙡𝙡𝙚𝙙 𝙖𝙩 ({request.x}, {request.y})"
-            }
-        
-        elif action == "go_back":
-            await page.go_back()
-            return {
-                "success": True,
-                "action": "go_back",
-                "message": "✅ 𝙒𝙚𝙣𝙩 𝙗𝙖𝙘𝙠"
-            }
-        
-        elif action == "go_forward":
-            await page.go_forward()
-            return {
-                "success": True,
-                "action": "go_forward",
-                "message": "✅ 𝙒𝙚𝙣𝙩 𝙛𝙤𝙧𝙬𝙖𝙧𝙙"
-            }
-        
-        elif action == "wait_5_seconds":
-            await asyncio.sleep(5)
-            return {
-                "success": True,
-                "action": "wait_5_seconds",
-                "message": "✅ 𝙒𝙖𝙞𝙩𝙚𝙙 5 𝙨𝙚𝙘𝙤𝙣𝙙𝙨"
-            }
-        
-        elif action == "key_combination":
-            keys = request.text.split('+')
-            for key in keys:
-                await page.keyboard.down(key.strip())
-            for key in reversed(keys):
-                await page.keyboard.up(key.strip())
-            return {
-                "success": True,
-                "action": "key_combination",
-                "keys": request.text,
-                "message": f"✅ 𝙋𝙧𝙚𝙨𝙨𝙚𝙙 {request.text}"
-            }
-        
-        elif action == "ai_command":
-            if request.session_id not in ai_sessions:
-                ai_session_id = await create_ai_session()
-                if not ai_session_id:
-                    raise HTTPException(status_code=500, detail="❌ Failed to create AI session")
-                ai_sessions[request.session_id] = ai_session_id
-            
-            ai_session_id = ai_sessions[request.session_id]
-            result = await execute_ai_command(ai_session_id, request.ai_prompt)
-            
-            return {
-                "success": result["success"],
-                "action": "ai_command",
-                "prompt": request.ai_prompt,
-                "thoughts": result.get("thoughts", []),
-                "final_message": result.get("final_message", ""),
-                "summary": result.get("summary", ""),
-                "message": "🤖 𝘼𝙄 𝙘𝙤𝙢𝙢𝙖𝙣𝙙 𝙚𝙭𝙚𝙘𝙪𝙩𝙚𝙙"
-            }
-        
-        elif action == "get_content":
-            content = await page.content()
-            url = page.url
-            title = await page.title()
-            return {
-                "success": True,
-                "action": "get_content",
-                "content": content,
-                "url": url,
-                "title": title,
-                "message": "📄 𝘾𝙤𝙣𝙩𝙚𝙣𝙩 𝙧𝙚𝙩𝙧𝙞𝙚𝙫𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
-            }
-        
-        elif action == "close":
-            await close_session_internal(request.session_id)
-            if request.session_id in ai_sessions:
-                del ai_sessions[request.session_id]
-            
-            await broadcast_event({
-                "type": "session_closed",
-                "session_id": request.session_id,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return {
-                "success": True,
-                "action": "close",
-                "session_id": request.session_id,
-                "message": "✅ 𝙎𝙚𝙨𝙨𝙞𝙤𝙣 𝙘𝙡𝙤𝙨𝙚𝙙 𝙨𝙪𝙘𝙘𝙚𝙨𝙨𝙛𝙪𝙡𝙡𝙮"
-            }
-        
-        else:
-            raise HTTPException(status_code=400, detail=f"❌ Unknown action: {action}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"❌ Error: {str(e)}")
+    
+    return StreamingResponse(
+        iter_chunks(image),
+        media_type=MEDIA_TYPES[request.format],
+        headers={"Content-Length": str(len(image))}
+    )
+
+@app.post("/api/content/stream")
+async def content_stream_endpoint(request: ContentStreamRequest, http_request: Request):
+    get_session(request.session_id)
+    encoding = choose_encoding(http_request.headers.get("accept-encoding", ""))
     
+    try:
+        async with concurrency_limiter.slot(request.session_id, "get_content"):
+            page = get_session(request.session_id)['page']
+            key, length = await snapshot_content(page, request.mode)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"❌ Error: {str(e)}")
+    
+    return StreamingResponse(
+        encode_stream(iter_snapshot(page, key, length, request.chunk_size), encoding),
+        media_type=CONTENT_MEDIA_TYPES[request.mode],
+        headers=response_headers(encoding)
+    )
+
+@app.post("/api/crawl")
+async def crawl_endpoint(request: CrawlRequest):
+    if len(request.urls) > CRAWL_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"❌ At most {CRAWL_MAX_URLS} URLs per crawl")
+    if not shard_manager or not shard_manager.is_running():
+        raise HTTPException(status_code=503, detail="❌ Browser is not running")
+    policy = server_resource_policy.merged(request)
+    crawler = Crawler(
+        request,
+        open_page=lambda: open_crawl_page(policy),
+        close_page=close_crawl_page,
+        slot=lambda: concurrency_limiter.slot(None, "crawl")
+    )
+    return StreamingResponse(
+        iter_ndjson(crawler.run()),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/ai/stream")
+async def ai_stream_endpoint(request: AiStreamRequest):
+    get_session(request.session_id)
+    timeout = request.timeout / 1000 if request.timeout else None
+    
+    async def events():
+        result = new_ai_result()
+        try:
+            async with concurrency_limiter.slot(request.session_id, "ai_command"):
+                get_session(request.session_id)
+                ai_session_id = await ensure_ai_session(request.session_id)
+                deadline = time.monotonic() + (timeout or AI_STREAM_TIMEOUT)
+                async for data in iter_ai_events(ai_session_id, request.ai_prompt, timeout):
+                    apply_ai_event(result, data)
+                    yield format_sse(classify_ai_event(data), data)
+                    if time.monotonic() > deadline:
+                        result["error"] = "AI command timed out"
+                        break
+        except HTTPException as e:
+            result["error"] = e.detail
+            yield format_sse("error", {"error": e.detail})
+        except Exception as e:
+            result["error"] = str(e)
+            yield format_sse("error", {"error": str(e)})
+        yield format_sse("done", result)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/automation/batch")
+async def automation_batch_endpoint(request: BatchRequest, http_request: Request):
+    session_id = request.session_id
+    steps = []
+    batch_started = time.perf_counter()
+
+    for index, step in enumerate(request.actions):
+        if not step.session_id:
+            step.session_id = session_id
+        started = time.perf_counter()
+        try:
+            result = await cancel_on_disconnect(http_request, dispatch_action(step))
+            status_code = 200
+        except HTTPException as e:
+            result = {"success": False, "action": step.action, "error": e.detail}
+            status_code = e.status_code
+        except Exception as e:
+            result = {"success": False, "action": step.action, "error": f"❌ Error: {str(e)}"}
+            status_code = 500
+
+        steps.append({
+            "index": index,
+            "status_code": status_code,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "result": result
+        })
+
+        if status_code == 200 and result.get("action") in ("create", "create_from_state"):
+            session_id = result["session_id"]
+        if status_code == 499 or (status_code != 200 and request.stop_on_error):
+            break
+
+    failed = sum(1 for step in steps if step["status_code"] != 200)
+    return {
+        "success": failed == 0 and len(steps) == len(request.actions),
+        "action": "batch",
+        "session_id": session_id,
+        "completed": len(steps),
+        "failed": failed,
+        "total_ms": round((time.perf_counter() - batch_started) * 1000, 2),
+        "steps": steps,
+        "message": "✅ 𝘽𝙖𝙩𝙘𝙝 𝙚𝙭𝙚𝙘𝙪𝙩𝙚𝙙" if failed == 0 else "⚠️ 𝘽𝙖𝙩𝙘𝙝 𝙛𝙞𝙣𝙞𝙨𝙝𝙚𝙙 𝙬𝙞𝙩𝙝 𝙚𝙧𝙧𝙤𝙧𝙨"
+    }
 
 if __name__ == "__main__":
     import uvicorn
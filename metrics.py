@@ -0,0 +1,139 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from tracing import span
+
+T = TypeVar("T")
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+ACTION_DURATION = Histogram(
+    "hammer_action_duration_seconds",
+    "Time spent running an automation action",
+    ["action", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+ACTION_QUEUE_WAIT = Histogram(
+    "hammer_action_queue_wait_seconds",
+    "Time an action waited for its session, action and global concurrency slots",
+    ["action"],
+    buckets=LATENCY_BUCKETS
+)
+ACTION_ERRORS = Counter(
+    "hammer_action_errors_total",
+    "Failed automation actions by exception class",
+    ["action", "exception"]
+)
+ACTIONS_IN_FLIGHT = Gauge(
+    "hammer_actions_in_flight",
+    "Automation actions currently running",
+    ["action"]
+)
+SESSIONS_CREATED = Counter(
+    "hammer_sessions_created_total",
+    "Browser sessions created"
+)
+SESSIONS_CLOSED = Counter(
+    "hammer_sessions_closed_total",
+    "Browser sessions closed",
+    ["reason"]
+)
+ACTIVE_SESSIONS = Gauge(
+    "hammer_active_sessions",
+    "Browser sessions currently open"
+)
+PLAYWRIGHT_CALL_DURATION = Histogram(
+    "hammer_playwright_call_duration_seconds",
+    "Time spent in individual Playwright calls",
+    ["method", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+EVENT_LOOP_LAG = Histogram(
+    "hammer_event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the event loop running it",
+    buckets=LOOP_LAG_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    "hammer_event_loop_lag_last_seconds",
+    "Most recent event loop lag sample"
+)
+
+
+def error_label(error: BaseException) -> str:
+    status_code = getattr(error, "status_code", None)
+    name = type(error).__name__
+    return f"{name}_{status_code}" if status_code else name
+
+
+@contextmanager
+def record_errors(action: str) -> Iterator[None]:
+    try:
+        yield
+    except BaseException as e:
+        ACTION_ERRORS.labels(action, error_label(e)).inc()
+        raise
+
+
+@asynccontextmanager
+async def track_action(action: str, queued_at: Optional[float] = None) -> AsyncIterator[None]:
+    started = time.perf_counter()
+    if queued_at is not None:
+        ACTION_QUEUE_WAIT.labels(action).observe(started - queued_at)
+    ACTIONS_IN_FLIGHT.labels(action).inc()
+    outcome = "success"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        ACTIONS_IN_FLIGHT.labels(action).dec()
+        ACTION_DURATION.labels(action, outcome).observe(time.perf_counter() - started)
+
+
+async def timed(method: str, awaitable: Awaitable[T]) -> T:
+    started = time.perf_counter()
+    outcome = "success"
+    try:
+        with span(method):
+            return await awaitable
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        PLAYWRIGHT_CALL_DURATION.labels(method, outcome).observe(time.perf_counter() - started)
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+
+def render_metrics() -> bytes:
+    return generate_latest()
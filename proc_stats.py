@@ -0,0 +1,88 @@
+import os
+from typing import Dict, List, Optional
+
+PROC_ROOT = "/proc"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def list_pids() -> List[int]:
+    try:
+        return [int(name) for name in os.listdir(PROC_ROOT) if name.isdigit()]
+    except OSError:
+        return []
+
+
+def read_cmdline(pid: int) -> List[str]:
+    try:
+        with open(f"{PROC_ROOT}/{pid}/cmdline", "rb") as f:
+            return [part.decode("utf-8", "replace") for part in f.read().split(b"\0") if part]
+    except OSError:
+        return []
+
+
+def read_stat(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"{PROC_ROOT}/{pid}/stat") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces, so split after the closing paren
+    end = data.rfind(")")
+    return [str(pid), data[data.find("(") + 1:end]] + data[end + 2:].split()
+
+
+def find_pid_with_arg(arg: str) -> Optional[int]:
+    for pid in list_pids():
+        if arg in read_cmdline(pid):
+            return pid
+    return None
+
+
+def children_map() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for pid in list_pids():
+        stat = read_stat(pid)
+        if stat:
+            children.setdefault(int(stat[3]), []).append(pid)
+    return children
+
+
+def process_tree(root_pid: int) -> List[int]:
+    children = children_map()
+    tree = []
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def process_rss(pid: int) -> int:
+    try:
+        with open(f"{PROC_ROOT}/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree_rss(root_pid: int) -> int:
+    return sum(process_rss(pid) for pid in process_tree(root_pid))
+
+
+def process_cpu_seconds(pid: int) -> float:
+    stat = read_stat(pid)
+    if not stat:
+        return 0.0
+    try:
+        return (int(stat[13]) + int(stat[14])) / CLOCK_TICKS
+    except (IndexError, ValueError):
+        return 0.0
+
+
+def process_type(pid: int) -> str:
+    for arg in read_cmdline(pid):
+        if arg.startswith("--type="):
+            return arg[7:]
+    return "browser"
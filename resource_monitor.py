@@ -0,0 +1,224 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from playwright.async_api import CDPSession
+
+from proc_stats import process_cpu_seconds, process_rss, process_tree, process_type
+
+ShardPids = Callable[[], List[Tuple[int, Optional[int]]]]
+
+SORT_KEYS = {
+    "cpu": "cpu_percent",
+    "cpu_time": "cpu_seconds",
+    "heap": "js_heap_used_mb",
+    "nodes": "nodes",
+    "listeners": "js_event_listeners"
+}
+
+PERFORMANCE_METRICS = {
+    "TaskDuration": "cpu_seconds",
+    "JSHeapUsedSize": "js_heap_used",
+    "JSHeapTotalSize": "js_heap_total",
+    "Nodes": "nodes",
+    "Documents": "documents",
+    "Frames": "frames",
+    "JSEventListeners": "js_event_listeners",
+    "LayoutCount": "layouts"
+}
+
+
+def sample_processes(shard_pids: List[Tuple[int, Optional[int]]]) -> Dict[int, Dict[str, Any]]:
+    processes = {}
+    for shard_index, root_pid in shard_pids:
+        if not root_pid:
+            continue
+        for pid in process_tree(root_pid):
+            processes[pid] = {
+                "pid": pid,
+                "shard": shard_index,
+                "type": process_type(pid),
+                "rss": process_rss(pid),
+                "cpu_seconds": process_cpu_seconds(pid)
+            }
+    return processes
+
+
+class ResourceMonitor:
+    def __init__(
+        self,
+        sessions: Dict[str, Dict[str, Any]],
+        shard_pids: ShardPids,
+        interval: float = 15,
+        sample_timeout: float = 5,
+        concurrency: int = 8
+    ):
+        self.sessions = sessions
+        self.shard_pids = shard_pids
+        self.interval = interval
+        self.sample_timeout = sample_timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.cdp_sessions: Dict[str, CDPSession] = {}
+        self.costs: Dict[str, Dict[str, Any]] = {}
+        self.processes: Dict[int, Dict[str, Any]] = {}
+        self.samples = 0
+        self.errors = 0
+        self.last_sample_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._sampling: Optional[asyncio.Task] = None
+
+    async def _cdp(self, session_id: str, session: Dict[str, Any]) -> CDPSession:
+        cdp = self.cdp_sessions.get(session_id)
+        if cdp is None:
+            page = session['page']
+            cdp = await page.context.new_cdp_session(page)
+            await cdp.send("Performance.enable")
+            self.cdp_sessions[session_id] = cdp
+        return cdp
+
+    async def sample_session(self, session_id: str, session: Dict[str, Any], now: float):
+        async with self.semaphore:
+            try:
+                cdp = await self._cdp(session_id, session)
+                result = await asyncio.wait_for(cdp.send("Performance.getMetrics"), self.sample_timeout)
+            except Exception:
+                self.errors += 1
+                self.cdp_sessions.pop(session_id, None)
+                return
+        if session_id not in self.sessions:
+            return
+        values = {PERFORMANCE_METRICS[metric["name"]]: metric["value"] for metric in result["metrics"] if metric["name"] in PERFORMANCE_METRICS}
+        previous = self.costs.get(session_id)
+        cpu_percent = 0.0
+        if previous and now > previous["sampled_at"]:
+            cpu_percent = max(0.0, values.get("cpu_seconds", 0) - previous["cpu_seconds"]) / (now - previous["sampled_at"]) * 100
+        self.costs[session_id] = {
+            "session_id": session_id,
+            "shard": session.get('shard'),
+            "cpu_seconds": round(values.get("cpu_seconds", 0.0), 3),
+            "cpu_percent": round(cpu_percent, 1),
+            "js_heap_used_mb": round(values.get("js_heap_used", 0) / (1024 * 1024), 2),
+            "js_heap_total_mb": round(values.get("js_heap_total", 0) / (1024 * 1024), 2),
+            "nodes": int(values.get("nodes", 0)),
+            "documents": int(values.get("documents", 0)),
+            "frames": int(values.get("frames", 0)),
+            "js_event_listeners": int(values.get("js_event_listeners", 0)),
+            "layouts": int(values.get("layouts", 0)),
+            "sampled_at": now
+        }
+
+    async def sample(self):
+        started = time.perf_counter()
+        now = time.monotonic()
+        sessions = list(self.sessions.items())
+        for session_id in list(self.cdp_sessions):
+            if session_id not in self.sessions:
+                cdp = self.cdp_sessions.pop(session_id)
+                try:
+                    await cdp.detach()
+                except Exception:
+                    pass
+        for session_id in list(self.costs):
+            if session_id not in self.sessions:
+                del self.costs[session_id]
+
+        await asyncio.gather(*(self.sample_session(session_id, session, now) for session_id, session in sessions))
+
+        previous = self.processes
+        processes = await asyncio.to_thread(sample_processes, self.shard_pids())
+        for pid, process in processes.items():
+            before = previous.get(pid)
+            elapsed = now - before["sampled_at"] if before else 0
+            process["cpu_percent"] = round(max(0.0, process["cpu_seconds"] - before["cpu_seconds"]) / elapsed * 100, 1) if elapsed > 0 else 0.0
+            process["sampled_at"] = now
+        self.processes = processes
+        self.samples += 1
+        self.last_sample_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def refresh(self):
+        if self._sampling is None or self._sampling.done():
+            self._sampling = asyncio.create_task(self.sample())
+        await asyncio.shield(self._sampling)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Resource Monitor Error: {e}")
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._sampling:
+            self._sampling.cancel()
+            await asyncio.gather(self._sampling, return_exceptions=True)
+            self._sampling = None
+        for cdp in self.cdp_sessions.values():
+            try:
+                await cdp.detach()
+            except Exception:
+                pass
+        self.cdp_sessions.clear()
+
+    def discard(self, session_id: str):
+        self.cdp_sessions.pop(session_id, None)
+        self.costs.pop(session_id, None)
+
+    def top_sessions(self, n: int, sort: str = "cpu") -> List[Dict[str, Any]]:
+        key = SORT_KEYS.get(sort, "cpu_percent")
+        ranked = sorted(self.costs.values(), key=lambda cost: cost[key], reverse=True)
+        return [{k: v for k, v in cost.items() if k != "sampled_at"} for cost in ranked[:n]]
+
+    def process_summary(self) -> List[Dict[str, Any]]:
+        summary: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for process in self.processes.values():
+            entry = summary.setdefault((process["shard"], process["type"]), {
+                "shard": process["shard"],
+                "type": process["type"],
+                "processes": 0,
+                "rss_mb": 0.0,
+                "cpu_percent": 0.0
+            })
+            entry["processes"] += 1
+            entry["rss_mb"] += process["rss"] / (1024 * 1024)
+            entry["cpu_percent"] += process["cpu_percent"]
+        return [
+            {**entry, "rss_mb": round(entry["rss_mb"], 1), "cpu_percent": round(entry["cpu_percent"], 1)}
+            for _, entry in sorted(summary.items())
+        ]
+
+    def top_processes(self, n: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.processes.values(), key=lambda process: process["cpu_percent"], reverse=True)
+        return [
+            {
+                "pid": process["pid"],
+                "shard": process["shard"],
+                "type": process["type"],
+                "rss_mb": round(process["rss"] / (1024 * 1024), 1),
+                "cpu_percent": process["cpu_percent"],
+                "cpu_seconds": round(process["cpu_seconds"], 2)
+            }
+            for process in ranked[:n]
+        ]
+
+    def stats(self, top_n: int = 5) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "errors": self.errors,
+            "last_sample_ms": self.last_sample_ms,
+            "sessions_sampled": len(self.costs),
+            "js_heap_used_mb": round(sum(cost["js_heap_used_mb"] for cost in self.costs.values()), 2),
+            "processes": self.process_summary(),
+            "top_sessions": self.top_sessions(top_n)
+        }
@@ -0,0 +1,142 @@
+import os
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field
+from playwright.async_api import BrowserContext, Request, Route
+
+TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "newrelic.com",
+    "nr-data.net",
+    "clarity.ms",
+    "bat.bing.com"
+]
+
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 60 * 1024,
+    "media": 500 * 1024,
+    "font": 40 * 1024,
+    "stylesheet": 20 * 1024,
+    "script": 40 * 1024,
+    "xhr": 5 * 1024,
+    "fetch": 5 * 1024
+}
+DEFAULT_ESTIMATED_BYTES = 10 * 1024
+
+
+class ResourcePolicy(BaseModel):
+    block_resource_types: List[str] = Field(default_factory=list)
+    block_url_patterns: List[str] = Field(default_factory=list)
+    block_domains: List[str] = Field(default_factory=list)
+    block_trackers: bool = False
+
+    def is_empty(self) -> bool:
+        return not (self.block_resource_types or self.block_url_patterns or self.block_domains or self.block_trackers)
+
+    def merged(self, override: Optional["ResourcePolicy"]) -> "ResourcePolicy":
+        if override is None:
+            return self
+        return ResourcePolicy(
+            block_resource_types=sorted(set(self.block_resource_types) | set(override.block_resource_types)),
+            block_url_patterns=self.block_url_patterns + override.block_url_patterns,
+            block_domains=sorted(set(self.block_domains) | set(override.block_domains)),
+            block_trackers=self.block_trackers or override.block_trackers
+        )
+
+    def domains(self) -> List[str]:
+        return self.block_domains + (TRACKER_DOMAINS if self.block_trackers else [])
+
+    def match(self, url: str, resource_type: str) -> Optional[str]:
+        if resource_type in self.block_resource_types:
+            return "resource_type"
+        host = urlsplit(url).hostname or ""
+        for domain in self.domains():
+            if host == domain or host.endswith("." + domain):
+                return "domain"
+        for pattern in self.block_url_patterns:
+            if fnmatch(url, pattern):
+                return "url_pattern"
+        return None
+
+
+def split_env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def default_policy() -> ResourcePolicy:
+    return ResourcePolicy(
+        block_resource_types=split_env_list("BLOCK_RESOURCE_TYPES"),
+        block_url_patterns=split_env_list("BLOCK_URL_PATTERNS"),
+        block_domains=split_env_list("BLOCK_DOMAINS"),
+        block_trackers=os.getenv("BLOCK_TRACKERS", "false").lower() in ("1", "true", "yes")
+    )
+
+
+class InterceptionStats:
+    def __init__(self):
+        self.blocked = 0
+        self.estimated_bytes_saved = 0
+        self.by_reason: Dict[str, int] = {}
+        self.by_type: Dict[str, int] = {}
+
+    def record(self, resource_type: str, reason: str):
+        self.blocked += 1
+        self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+        self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "blocked_requests": self.blocked,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "by_reason": dict(self.by_reason),
+            "by_type": dict(self.by_type)
+        }
+
+
+interception_totals = InterceptionStats()
+
+
+class RequestInterceptor:
+    def __init__(self, policy: ResourcePolicy):
+        self.policy = policy
+        self.stats = InterceptionStats()
+        self.installed = False
+
+    async def install(self, context: BrowserContext):
+        if self.installed or self.policy.is_empty():
+            return
+        await context.route("**/*", self.handle)
+        self.installed = True
+
+    async def handle(self, route: Route, request: Request):
+        reason = self.policy.match(request.url, request.resource_type)
+        if reason is None:
+            await route.fallback()
+            return
+        self.stats.record(request.resource_type, reason)
+        interception_totals.record(request.resource_type, reason)
+        await route.abort("blockedbyclient")
+
+    def delta(self, before: Dict[str, Any]) -> Dict[str, Any]:
+        after = self.stats.snapshot()
+        return {
+            "blocked_requests": after["blocked_requests"] - before["blocked_requests"],
+            "estimated_bytes_saved": after["estimated_bytes_saved"] - before["estimated_bytes_saved"]
+        }
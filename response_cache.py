@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from playwright.async_api import BrowserContext, Request, Route
+
+SKIPPED_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+    "set-cookie",
+    "age"
+}
+
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip()] = argument.strip().strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Dict[str, str]) -> Optional[float]:
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if any(name in directives for name in ("no-store", "no-cache", "private")):
+        return None
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                return float(directives[name])
+            except ValueError:
+                return None
+    if headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return None
+        return expires - time.time()
+    return None
+
+
+class ResponseCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.entry_dir = os.path.join(directory, "entries")
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.vary: Dict[str, List[str]] = {}
+        self.blob_refs: Dict[str, int] = {}
+        self.blob_sizes: Dict[str, int] = {}
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    def load(self):
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.entry_dir, exist_ok=True)
+        loaded = []
+        for name in os.listdir(self.entry_dir):
+            path = os.path.join(self.entry_dir, name)
+            try:
+                with open(path) as f:
+                    loaded.append((os.path.getmtime(path), json.load(f)))
+            except (OSError, ValueError):
+                continue
+        for _, entry in sorted(loaded, key=lambda item: item[0]):
+            if os.path.exists(self.blob_path(entry["body"])):
+                self._index(entry)
+            else:
+                self._remove_file(os.path.join(self.entry_dir, entry["key"] + ".json"))
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    def entry_key(self, url: str, headers: Dict[str, str], vary: List[str]) -> str:
+        material = url + "\n" + "\n".join(f"{name}:{headers.get(name, '')}" for name in vary)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _index(self, entry: Dict[str, Any]):
+        self.entries[entry["key"]] = entry
+        self.vary[entry["url"]] = entry["vary"]
+        digest = entry["body"]
+        if self.blob_refs.get(digest, 0) == 0:
+            self.blob_sizes[digest] = entry["size"]
+            self.size_bytes += entry["size"]
+        self.blob_refs[digest] = self.blob_refs.get(digest, 0) + 1
+
+    def _unindex(self, key: str) -> Optional[str]:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        digest = entry["body"]
+        self.blob_refs[digest] -= 1
+        if self.blob_refs[digest] == 0:
+            del self.blob_refs[digest]
+            self.size_bytes -= self.blob_sizes.pop(digest, 0)
+            return digest
+        return None
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _remove_files(self, paths: List[str]):
+        for path in paths:
+            self._remove_file(path)
+
+    async def _delete(self, key: str):
+        orphan = self._unindex(key)
+        paths = [os.path.join(self.entry_dir, key + ".json")]
+        if orphan:
+            paths.append(self.blob_path(orphan))
+        await asyncio.to_thread(self._remove_files, paths)
+
+    def _read_blob(self, digest: str) -> bytes:
+        with open(self.blob_path(digest), "rb") as f:
+            return f.read()
+
+    def _write(self, entry: Dict[str, Any], body: bytes):
+        blob_path = self.blob_path(entry["body"])
+        if not os.path.exists(blob_path):
+            with open(blob_path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(blob_path + ".tmp", blob_path)
+        with open(os.path.join(self.entry_dir, entry["key"] + ".json"), "w") as f:
+            json.dump(entry, f)
+
+    async def lookup(self, url: str, headers: Dict[str, str]) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        key = self.entry_key(url, headers, self.vary.get(url, []))
+        entry = self.entries.get(key)
+        if entry is None or entry["expires_at"] <= time.time():
+            if entry is not None:
+                await self._delete(key)
+            self.misses += 1
+            return None
+        try:
+            body = await asyncio.to_thread(self._read_blob, entry["body"])
+        except OSError:
+            await self._delete(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.bytes_served += len(body)
+        return entry, body
+
+    async def store(self, url: str, request_headers: Dict[str, str], status: int, headers: Dict[str, str], body: bytes) -> bool:
+        if status != 200 or "set-cookie" in headers or len(body) > self.max_bytes // 10:
+            return False
+        credentialed = any(request_headers.get(name) for name in CREDENTIAL_HEADERS)
+        if credentialed and "public" not in parse_cache_control(headers.get("cache-control", "")):
+            return False
+        lifetime = freshness_lifetime(headers)
+        vary = sorted(name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip())
+        if not lifetime or lifetime <= 0 or "*" in vary:
+            return False
+
+        key = self.entry_key(url, request_headers, vary)
+        entry = {
+            "key": key,
+            "url": url,
+            "vary": vary,
+            "status": status,
+            "headers": {name: value for name, value in headers.items() if name.lower() not in SKIPPED_HEADERS},
+            "body": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+            "stored_at": time.time(),
+            "expires_at": time.time() + lifetime
+        }
+        await asyncio.to_thread(self._write, entry, body)
+        if key in self.entries:
+            orphan = self._unindex(key)
+            if orphan and orphan != entry["body"]:
+                await asyncio.to_thread(self._remove_file, self.blob_path(orphan))
+        self._index(entry)
+        self.stores += 1
+
+        while self.size_bytes > self.max_bytes and self.entries:
+            await self._delete(next(iter(self.entries)))
+            self.evictions += 1
+        return True
+
+    async def install(self, context: BrowserContext):
+        await context.route("**/*", self.handle)
+
+    async def handle(self, route: Route, request: Request):
+        if request.method != "GET":
+            await route.fallback()
+            return
+        request_headers = await request.all_headers()
+        if "range" in request_headers:
+            await route.fallback()
+            return
+
+        cached = await self.lookup(request.url, request_headers)
+        if cached:
+            entry, body = cached
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+            return
+
+        try:
+            response = await route.fetch(max_redirects=0)
+            body = await response.body()
+        except Exception:
+            await route.fallback()
+            return
+        await route.fulfill(response=response, body=body)
+        if 300 <= response.status < 400:
+            return
+        try:
+            await self.store(request.url, request_headers, response.status, response.headers, body)
+        except OSError as e:
+            print(f"Response Cache Error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size_mb": round(self.size_bytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes_served": self.bytes_served
+        }
@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import time
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+from playwright.async_api import CDPSession, Page
+
+
+class ScreencastSettings(BaseModel):
+    fps: float = Field(default=5, gt=0, le=30)
+    quality: int = Field(default=60, ge=1, le=100)
+    max_width: Optional[int] = Field(default=None, gt=0)
+    max_height: Optional[int] = Field(default=None, gt=0)
+
+
+class Screencast:
+    def __init__(self, page: Page, settings: ScreencastSettings):
+        self.page = page
+        self.settings = settings
+        self.cdp: Optional[CDPSession] = None
+        self.latest: Optional[Dict[str, Any]] = None
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.acks = set()
+        self.pending_ack: Optional[int] = None
+        self.received = 0
+        self.sent = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.started_at = time.monotonic()
+
+    async def start(self):
+        self.cdp = await self.page.context.new_cdp_session(self.page)
+        self.cdp.on("Page.screencastFrame", self._on_frame)
+        self.page.on("close", self._on_close)
+        await self._start_screencast()
+
+    async def _start_screencast(self):
+        params: Dict[str, Any] = {"format": "jpeg", "quality": self.settings.quality}
+        if self.settings.max_width:
+            params["maxWidth"] = self.settings.max_width
+        if self.settings.max_height:
+            params["maxHeight"] = self.settings.max_height
+        await self.cdp.send("Page.startScreencast", params)
+
+    async def update(self, settings: ScreencastSettings):
+        restart = (settings.quality, settings.max_width, settings.max_height) != (
+            self.settings.quality, self.settings.max_width, self.settings.max_height
+        )
+        self.settings = settings
+        if restart and not self.closed:
+            await self.cdp.send("Page.stopScreencast")
+            self.latest = None
+            self.pending_ack = None
+            await self._start_screencast()
+
+    def _on_frame(self, params: Dict[str, Any]):
+        self.received += 1
+        if self.latest is not None:
+            self.skipped += 1
+            task = asyncio.ensure_future(self._ack(self.latest["sessionId"]))
+            self.acks.add(task)
+            task.add_done_callback(self.acks.discard)
+        self.latest = params
+        self.ready.set()
+
+    async def _ack(self, frame_session_id: int):
+        try:
+            await self.cdp.send("Page.screencastFrameAck", {"sessionId": frame_session_id})
+        except Exception:
+            pass
+
+    def _on_close(self, _page: Page):
+        self.closed = True
+        self.ready.set()
+
+    async def next_frame(self) -> Optional[bytes]:
+        if self.pending_ack is not None:
+            frame_session_id, self.pending_ack = self.pending_ack, None
+            await self._ack(frame_session_id)
+        while self.latest is None:
+            if self.closed:
+                return None
+            self.ready.clear()
+            await self.ready.wait()
+        frame, self.latest = self.latest, None
+        self.pending_ack = frame["sessionId"]
+        data = base64.b64decode(frame["data"])
+        self.sent += 1
+        self.bytes_sent += len(data)
+        return data
+
+    async def stop(self):
+        self.closed = True
+        self.ready.set()
+        self.page.remove_listener("close", self._on_close)
+        if self.cdp:
+            try:
+                await self.cdp.send("Page.stopScreencast")
+                await self.cdp.detach()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "received": self.received,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "bytes_sent": self.bytes_sent,
+            "fps": round(self.sent / elapsed, 2) if elapsed else 0.0,
+            "settings": self.settings.model_dump()
+        }
@@ -0,0 +1,139 @@
+import asyncio
+import base64
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from PIL import Image
+from playwright.async_api import Page
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp"
+}
+
+PIL_FORMATS = {
+    "png": "PNG",
+    "jpeg": "JPEG",
+    "webp": "WEBP"
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_QUALITY = 80
+
+encode_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SCREENSHOT_ENCODE_WORKERS", 2)),
+    thread_name_prefix="screenshot-encode"
+)
+encode_semaphore = asyncio.Semaphore(int(os.getenv("SCREENSHOT_ENCODE_CONCURRENCY", 4)))
+
+
+async def capture_screenshot(
+    page: Page,
+    image_format: str = "png",
+    quality: Optional[int] = None,
+    full_page: bool = False,
+    clip: Optional[Dict[str, float]] = None,
+    scale: float = 1.0
+) -> bytes:
+    cdp = await page.context.new_cdp_session(page)
+    try:
+        params: Dict[str, Any] = {"format": image_format, "fromSurface": True}
+        if quality is not None and image_format != "png":
+            params["quality"] = quality
+
+        if clip is None and (full_page or scale != 1.0):
+            metrics = await cdp.send("Page.getLayoutMetrics")
+            if full_page:
+                size = metrics["cssContentSize"]
+                clip = {"x": 0, "y": 0, "width": size["width"], "height": size["height"]}
+            else:
+                viewport = metrics["cssVisualViewport"]
+                clip = {
+                    "x": viewport["pageX"],
+                    "y": viewport["pageY"],
+                    "width": viewport["clientWidth"],
+                    "height": viewport["clientHeight"]
+                }
+
+        if clip is not None:
+            params["clip"] = {**clip, "scale": scale}
+            params["captureBeyondViewport"] = True
+
+        result = await cdp.send("Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+    finally:
+        await cdp.detach()
+
+
+def iter_chunks(data: bytes, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset:offset + chunk_size])
+
+
+def save_image(image: Image.Image, image_format: str, quality: Optional[int]) -> bytes:
+    if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    options: Dict[str, Any] = {}
+    if image_format != "png":
+        options["quality"] = quality or DEFAULT_QUALITY
+    image.save(buffer, PIL_FORMATS[image_format], **options)
+    return buffer.getvalue()
+
+
+def transcode_image(
+    data: bytes,
+    image_format: str = "png",
+    quality: Optional[int] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    tile_height: Optional[int] = None
+) -> Dict[str, Any]:
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if max_width or max_height:
+            image.thumbnail((max_width or image.width, max_height or image.height), Image.LANCZOS)
+
+        width, height = image.size
+        if tile_height and height > tile_height:
+            tiles = [image.crop((0, top, width, min(top + tile_height, height))) for top in range(0, height, tile_height)]
+        else:
+            tiles = [image]
+
+        encoded: List[str] = []
+        for tile in tiles:
+            encoded.append(base64.b64encode(save_image(tile, image_format, quality)).decode())
+
+    return {"width": width, "height": height, "images": encoded}
+
+
+def encode_png(data: bytes) -> Dict[str, Any]:
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+    return {"width": width, "height": height, "images": [base64.b64encode(data).decode()]}
+
+
+async def encode_screenshot(
+    data: bytes,
+    image_format: str = "png",
+    quality: Optional[int] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    tile_height: Optional[int] = None
+) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    async with encode_semaphore:
+        started = time.perf_counter()
+        if image_format == "png" and not (max_width or max_height or tile_height):
+            result = await loop.run_in_executor(encode_executor, encode_png, data)
+        else:
+            result = await loop.run_in_executor(
+                encode_executor,
+                lambda: transcode_image(data, image_format, quality, max_width, max_height, tile_height)
+            )
+        result["encode_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
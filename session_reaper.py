@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+EvictCallback = Callable[[str, str], Awaitable[None]]
+RssSampler = Callable[[], Awaitable[int]]
+BusyCheck = Callable[[str], bool]
+
+
+class SessionReaper:
+    def __init__(
+        self,
+        sessions: Dict[str, Dict[str, Any]],
+        evict: EvictCallback,
+        idle_ttl: float = 900,
+        max_sessions: int = 50,
+        max_rss_bytes: int = 0,
+        rss_sampler: Optional[RssSampler] = None,
+        interval: float = 30,
+        rss_settle_time: float = 1.0,
+        is_busy: Optional[BusyCheck] = None
+    ):
+        self.sessions = sessions
+        self.evict = evict
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_rss_bytes = max_rss_bytes
+        self.rss_sampler = rss_sampler
+        self.interval = interval
+        self.rss_settle_time = rss_settle_time
+        self.is_busy = is_busy
+        self.evictions = {"idle": 0, "lru": 0, "memory": 0}
+        self.skipped_busy = 0
+        self.last_rss_bytes = 0
+        self.sweeps = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, session_id: str):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session['last_activity'] = time.monotonic()
+
+    def lru_order(self) -> List[str]:
+        return sorted(self.sessions, key=lambda session_id: self.sessions[session_id].get('last_activity', 0))
+
+    def evictable(self, session_id: str) -> bool:
+        if session_id not in self.sessions:
+            return False
+        if self.is_busy and self.is_busy(session_id):
+            self.skipped_busy += 1
+            return False
+        return True
+
+    async def _evict(self, session_id: str, reason: str) -> bool:
+        if not self.evictable(session_id):
+            return False
+        self.evictions[reason] += 1
+        try:
+            await self.evict(session_id, reason)
+        except Exception as e:
+            print(f"Session Reaper Error: {e}")
+            self.sessions.pop(session_id, None)
+        return True
+
+    async def _evict_lru(self, count: int, reason: str) -> int:
+        evicted = 0
+        for session_id in self.lru_order():
+            if evicted >= count:
+                break
+            if await self._evict(session_id, reason):
+                evicted += 1
+        return evicted
+
+    async def make_room(self):
+        if self.max_sessions <= 0:
+            return
+        await self._evict_lru(len(self.sessions) - self.max_sessions + 1, "lru")
+
+    async def sweep(self):
+        self.sweeps += 1
+        if self.idle_ttl > 0:
+            now = time.monotonic()
+            for session_id in self.lru_order():
+                session = self.sessions.get(session_id)
+                if session is None:
+                    continue
+                if now - session.get('last_activity', now) < self.idle_ttl:
+                    break
+                await self._evict(session_id, "idle")
+
+        if self.max_sessions > 0:
+            await self._evict_lru(len(self.sessions) - self.max_sessions, "lru")
+
+        if self.max_rss_bytes > 0 and self.rss_sampler:
+            self.last_rss_bytes = await self.rss_sampler()
+            while self.last_rss_bytes > self.max_rss_bytes and self.sessions:
+                if not await self._evict_lru(1, "memory"):
+                    break
+                await asyncio.sleep(self.rss_settle_time)
+                self.last_rss_bytes = await self.rss_sampler()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Session Reaper Error: {e}")
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "idle_ttl_seconds": self.idle_ttl,
+            "max_sessions": self.max_sessions,
+            "max_rss_mb": round(self.max_rss_bytes / (1024 * 1024), 1),
+            "last_rss_mb": round(self.last_rss_bytes / (1024 * 1024), 1),
+            "sweeps": self.sweeps,
+            "skipped_busy": self.skipped_busy,
+            "evictions": dict(self.evictions)
+        }
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+STATE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def valid_state_name(name: str) -> bool:
+    return bool(STATE_NAME_PATTERN.match(name)) and name not in (".", "..")
+
+
+class StateStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.loads = 0
+        self.saves = 0
+
+    def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if valid_state_name(record.get("name", "")):
+                self.states[record["name"]] = record
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name + ".json")
+
+    def _write(self, record: Dict[str, Any]):
+        path = self.path(record["name"])
+        with open(path + ".tmp", "w") as f:
+            json.dump(record, f)
+        os.replace(path + ".tmp", path)
+
+    def _remove(self, name: str):
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+
+    async def save(self, name: str, state: Dict[str, Any], url: Optional[str] = None) -> Dict[str, Any]:
+        record = {
+            "name": name,
+            "state": state,
+            "url": url,
+            "saved_at": time.time()
+        }
+        await asyncio.to_thread(self._write, record)
+        self.states[name] = record
+        self.saves += 1
+        return self.describe(record)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        record = self.states.get(name)
+        if record is not None:
+            self.loads += 1
+        return record
+
+    async def delete(self, name: str) -> bool:
+        if self.states.pop(name, None) is None:
+            return False
+        await asyncio.to_thread(self._remove, name)
+        return True
+
+    def describe(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        state = record["state"]
+        return {
+            "name": record["name"],
+            "url": record.get("url"),
+            "saved_at": record["saved_at"],
+            "cookies": len(state.get("cookies", [])),
+            "origins": [origin.get("origin") for origin in state.get("origins", [])]
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [self.describe(record) for _, record in sorted(self.states.items())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "states": len(self.states),
+            "saves": self.saves,
+            "loads": self.loads
+        }
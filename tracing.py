@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", 2))
+TRACE_EXPORT_BUFFER = int(os.getenv("TRACE_EXPORT_BUFFER", 10000))
+MAX_SPANS_PER_TRACE = 1000
+
+
+class Span:
+    def __init__(self, span_id: int, name: str, parent_id: Optional[int], started: float, attributes: Dict[str, Any]):
+        self.id = span_id
+        self.name = name
+        self.parent_id = parent_id
+        self.started = started
+        self.ended: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.attributes = attributes or {}
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+
+    def open_span(self, name: str, parent_id: Optional[int], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            self.dropped_spans += 1
+            return None
+        span = Span(len(self.spans) + 1, name, parent_id, time.perf_counter(), attributes)
+        self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.started_at,
+            "duration_ms": round((now - self.started) * 1000, 2),
+            "dropped_spans": self.dropped_spans,
+            "spans": [
+                {
+                    "id": span.id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_ms": round((span.started - self.started) * 1000, 2),
+                    "duration_ms": round(((span.ended or now) - span.started) * 1000, 2),
+                    "attributes": span.attributes,
+                    "error": span.error
+                }
+                for span in self.spans
+            ]
+        }
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+
+
+def should_trace(debug_timing: bool) -> bool:
+    if debug_timing:
+        return True
+    return bool(TRACE_EXPORT_FILE) and random.random() < TRACE_SAMPLE_RATE
+
+
+@contextmanager
+def start_trace(name: str, enabled: bool, **attributes: Any) -> Iterator[Optional[Trace]]:
+    if not enabled:
+        yield None
+        return
+    trace = Trace(name, attributes)
+    trace_token = current_trace.set(trace)
+    span_token = current_span.set(None)
+    try:
+        yield trace
+    finally:
+        current_span.reset(span_token)
+        current_trace.reset(trace_token)
+        trace_exporter.export(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    opened = trace.open_span(name, current_span.get(), attributes)
+    if opened is None:
+        yield None
+        return
+    token = current_span.set(opened.id)
+    try:
+        yield opened
+    except BaseException as e:
+        opened.error = type(e).__name__
+        raise
+    finally:
+        opened.ended = time.perf_counter()
+        current_span.reset(token)
+
+
+def record_span(name: str, started: float, error: Optional[str] = None, **attributes: Any):
+    trace = current_trace.get()
+    if trace is None:
+        return
+    recorded = trace.open_span(name, current_span.get(), attributes)
+    if recorded is not None:
+        recorded.started = started
+        recorded.ended = time.perf_counter()
+        recorded.error = error
+
+
+class TraceExporter:
+    def __init__(self, path: str, interval: float, buffer_size: int):
+        self.path = path
+        self.interval = interval
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self.task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Trace):
+        if not self.path:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(trace.to_dict())
+
+    async def start(self):
+        if self.path and self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        records = list(self.buffer)
+        self.buffer.clear()
+        try:
+            await asyncio.to_thread(self._write, records)
+            self.exported += len(records)
+        except OSError as e:
+            self.dropped += len(records)
+            print(f"Trace Export Error: {e}")
+
+    def _write(self, records: List[Dict[str, Any]]):
+        with open(self.path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "file": self.path or None,
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "buffered": len(self.buffer),
+            "exported": self.exported,
+            "dropped": self.dropped
+        }
+
+
+trace_exporter = TraceExporter(TRACE_EXPORT_FILE, TRACE_EXPORT_INTERVAL, TRACE_EXPORT_BUFFER)
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from playwright.async_api import Page, Request
+
+from tracing import span
+
+LOAD_STATES = ("commit", "domcontentloaded", "load", "networkidle")
+
+WaitMode = Literal["commit", "domcontentloaded", "load", "networkidle", "selector", "url", "network_quiet", "function"]
+
+DEFAULT_WAIT_TIMEOUT = 30000
+POLL_INTERVAL = 0.05
+
+
+class WaitParams(BaseModel):
+    wait_until: Optional[WaitMode] = None
+    wait_selector: Optional[str] = None
+    wait_url: Optional[str] = None
+    wait_function: Optional[str] = None
+    quiet_ms: int = Field(default=500, ge=0)
+    timeout: Optional[int] = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def check_wait_target(self):
+        required = {"selector": "wait_selector", "url": "wait_url", "function": "wait_function"}
+        field = required.get(self.wait_until)
+        if field and not getattr(self, field):
+            raise ValueError(f"{field} is required when wait_until is '{self.wait_until}'")
+        return self
+
+
+class NetworkQuietWatcher:
+    def __init__(self, page: Page):
+        self.page = page
+        self.inflight = set()
+        self.last_change = time.monotonic()
+
+    def _on_request(self, request: Request):
+        self.inflight.add(request)
+        self.last_change = time.monotonic()
+
+    def _on_done(self, request: Request):
+        self.inflight.discard(request)
+        self.last_change = time.monotonic()
+
+    def attach(self):
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_done)
+        self.page.on("requestfailed", self._on_done)
+
+    def detach(self):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_done)
+        self.page.remove_listener("requestfailed", self._on_done)
+
+    async def wait(self, quiet_ms: int, timeout_ms: int):
+        deadline = time.monotonic() + timeout_ms / 1000
+        quiet = quiet_ms / 1000
+        while True:
+            now = time.monotonic()
+            if not self.inflight and now - self.last_change >= quiet:
+                return
+            if now >= deadline:
+                raise asyncio.TimeoutError(
+                    f"Network was not quiet for {quiet_ms}ms within {timeout_ms}ms ({len(self.inflight)} requests in flight)"
+                )
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+@asynccontextmanager
+async def watch_network(page: Page, enabled: bool) -> AsyncIterator[Optional[NetworkQuietWatcher]]:
+    if not enabled:
+        yield None
+        return
+    watcher = NetworkQuietWatcher(page)
+    watcher.attach()
+    try:
+        yield watcher
+    finally:
+        watcher.detach()
+
+
+async def wait_for(page: Page, params: WaitParams, watcher: Optional[NetworkQuietWatcher] = None):
+    mode = params.wait_until
+    timeout = params.timeout or DEFAULT_WAIT_TIMEOUT
+    if mode is None or mode == "commit":
+        return
+    if mode in LOAD_STATES:
+        await page.wait_for_load_state(mode, timeout=timeout)
+    elif mode == "selector":
+        await page.wait_for_selector(params.wait_selector, state="visible", timeout=timeout)
+    elif mode == "url":
+        await page.wait_for_url(params.wait_url, wait_until="commit", timeout=timeout)
+    elif mode == "function":
+        await page.wait_for_function(params.wait_function, timeout=timeout)
+    elif mode == "network_quiet":
+        await (watcher or NetworkQuietWatcher(page)).wait(params.quiet_ms, timeout)
+
+
+async def run_with_wait(
+    page: Page,
+    params: WaitParams,
+    perform: Callable[[], Awaitable[None]],
+    fallback_sleep_ms: int = 0
+) -> float:
+    async with watch_network(page, params.wait_until == "network_quiet") as watcher:
+        await perform()
+        started = time.perf_counter()
+        if params.wait_until:
+            with span("wait", mode=params.wait_until):
+                await wait_for(page, params, watcher)
+        elif fallback_sleep_ms:
+            with span("sleep", ms=fallback_sleep_ms):
+                await asyncio.sleep(fallback_sleep_ms / 1000)
+        return round((time.perf_counter() - started) * 1000, 2)